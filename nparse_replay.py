@@ -0,0 +1,71 @@
+"""NomnsParse: Replay a recorded Everquest log through the parsers."""
+import argparse
+import os
+import sys
+
+
+def parse_speed(text):
+    """'10', '10x' or 'max' -> float, 0 being as fast as possible."""
+    text = text.lower()
+    if text.endswith('x') and text != 'max':
+        text = text[:-1]
+    if text in ('max', 'fast', '0'):
+        return 0.0
+    speed = float(text)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError('speed must be positive or "max"')
+    return speed
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('log_file', help='eqlog_<character>_<server>.txt to replay')
+    arg_parser.add_argument(
+        '--speed', type=parse_speed, default=1.0,
+        help='replay speed multiplier (1x, 10x, ...) or "max" for as fast as possible')
+    arg_parser.add_argument(
+        '--show', action='store_true',
+        help='show the parser windows instead of running headless, keeps running after the replay')
+    args = arg_parser.parse_args()
+
+    if not args.show:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    from PySide6.QtCore import QTimer
+    from PySide6.QtGui import QFontDatabase
+
+    from nParse.helpers import config, resource_path
+    from nParse.helpers.application import NomnsParse
+    from nParse.helpers.replay import LogReplay
+
+    # a replay must not change the settings of the log it was recorded from,
+    # ie. the last zone and zone links
+    config.keep_in_memory()
+
+    APP = NomnsParse(sys.argv[:1], read_logs=False)
+    APP.setStyleSheet(open(resource_path(os.path.join('data', 'ui', '_.css'))).read())
+    APP.setQuitOnLastWindowClosed(False)
+    QFontDatabase.addApplicationFont(
+        resource_path(os.path.join('data', 'fonts', 'NotoSans-Regular.ttf')))
+    QFontDatabase.addApplicationFont(
+        resource_path(os.path.join('data', 'fonts', 'NotoSans-Bold.ttf')))
+
+    REPLAY = LogReplay(args.log_file, speed=args.speed)
+
+    def quit_when_loaded():
+        # a fast replay can finish while a map is still loading in the background
+        if APP._parsers_dict["maps"].loading:
+            QTimer.singleShot(50, quit_when_loaded)
+        else:
+            APP.quit()
+
+    def replay_finished():
+        print("Replayed {} lines in {:.2f}s ({:.0f} lines/sec)".format(
+            REPLAY.lines, REPLAY.elapsed, REPLAY.lines / max(REPLAY.elapsed, 1e-9)))
+        if not args.show:
+            quit_when_loaded()
+
+    REPLAY.finished.connect(replay_finished)
+    REPLAY.start()
+
+    sys.exit(APP.exec())
@@ -7,6 +7,11 @@ import json
 
 import semver
 
+MONTHS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12
+}
+
 def get_version():
     version = None
     try:
@@ -19,14 +24,52 @@ def get_version():
     return version
 
 
+class TimestampParser:
+    """
+    Parses everquest log timestamps '[Mon Jan 01 00:00:00 2024]' by their fixed
+    layout.  The last date and the last timestamp are kept, since consecutive
+    lines usually share the same day and second.
+    """
+
+    def __init__(self):
+        self._last_date_key = None  # 'Jan 01 2024'
+        self._last_date = None
+        self._last_stamp = None
+        self._last_timestamp = None
+
+    def parse(self, line):
+        """Returns the datetime of a log entry, raises ValueError if it has none."""
+        stamp = line[1:25]
+        if stamp == self._last_stamp:
+            return self._last_timestamp
+        if line[25:26] != ']' or stamp[13] != ':' or stamp[16] != ':':
+            raise ValueError('No timestamp in line: %r' % line)
+        date_key = stamp[4:10] + stamp[19:]
+        if date_key == self._last_date_key:
+            date = self._last_date
+        else:
+            try:
+                date = datetime(int(stamp[20:]), MONTHS[stamp[4:7]], int(stamp[8:10]))
+            except KeyError as e:
+                raise ValueError('No timestamp in line: %r' % line) from e
+            self._last_date_key, self._last_date = date_key, date
+        timestamp = date.replace(
+            hour=int(stamp[11:13]),
+            minute=int(stamp[14:16]),
+            second=int(stamp[17:19])
+        )
+        self._last_stamp, self._last_timestamp = stamp, timestamp
+        return timestamp
+
+
+_timestamp_parser = TimestampParser()
+
+
 def parse_line(line):
     """
     Parses and then returns an everquest log entry's date and text.
     """
-    index = line.find("]") + 1
-    sdate = line[1:index - 1].strip()
-    text = line[index:].strip()
-    return datetime.strptime(sdate, '%a %b %d %H:%M:%S %Y'), text
+    return _timestamp_parser.parse(line), strip_timestamp(line)
 
 
 def strip_timestamp(line):
@@ -1,3 +1,4 @@
+import functools
 import os
 import webbrowser
 
@@ -7,6 +8,7 @@ from PySide6.QtWidgets import QApplication, QFileDialog, QMenu, QSystemTrayIcon
 import semver
 
 from nParse.helpers import config, logreader, resource_path, get_version
+from nParse.helpers.dispatcher import LineDispatcher
 from nParse.helpers.settings import SettingsWindow, SettingsSignals
 from nParse.helpers.logreader import LogReaderSignals
 from nParse.helpers.location_service import LocationSharingService, LocationSharingSignals
@@ -34,7 +36,7 @@ else:
 class NomnsParse(QApplication):
     """Application Control."""
 
-    def __init__(self, *args):
+    def __init__(self, *args, read_logs=True):
         super().__init__(*args)
 
         # Updates
@@ -65,7 +67,12 @@ class NomnsParse(QApplication):
         self._system_tray.show()
 
         # Turn On
-        self._toggle()
+        if read_logs:
+            self._parsers_dict["spells"].persist_timers()
+            self._toggle()
+        else:
+            # lines are fed in by something else, ie. a LogReplay
+            QApplication.instance()._signals["logreader"].new_lines.connect(self._parse)
 
         if self.new_version_available():
             self._system_tray.showMessage(
@@ -90,6 +97,15 @@ class NomnsParse(QApplication):
             self._parsers_dict["spells"],
             self._parsers_dict["discord"],
         ]
+        self._dispatcher = LineDispatcher()
+        for parser in self._parsers:
+            self._dispatcher.add_prefix(
+                'toggle_clickthrough_%s' % parser.name,
+                functools.partial(self._toggle_clickthrough, parser))
+            self._dispatcher.add_prefix(
+                'toggle_%s' % parser.name,
+                functools.partial(self._toggle_parser, parser))
+            parser.register(self._dispatcher)
 
     def _toggle(self):
         if not self._toggled:
@@ -102,28 +118,28 @@ class NomnsParse(QApplication):
             else:
                 self._log_reader = logreader.LogReader(
                     os.path.abspath(config.data['general']['eq_log_dir']))
-                QApplication.instance()._signals["logreader"].new_line.connect(self._parse)
+                QApplication.instance()._signals["logreader"].new_lines.connect(self._parse)
                 self._toggled = True
         else:
             if self._log_reader:
+                self._log_reader.stop()
                 self._log_reader.deleteLater()
                 self._log_reader = None
             self._toggled = False
 
-    def _parse(self, new_line):
-        if new_line:
-            timestamp, text = new_line  # (datetime, text)
-            #  don't send parse to non toggled items, except maps.  always parse maps
-            for parser in self._parsers:
-                if text.startswith('toggle_clickthrough_%s' % parser.name):
-                    config.data[parser.name]['clickthrough'] = (
-                        not config.data[parser.name]['clickthrough'])
-                    config.save()
-                    parser._set_flags()
-                elif text.startswith('toggle_%s' % parser.name):
-                    parser.toggle()
-                elif config.data[parser.name]['toggled'] or parser.name == 'maps':
-                    parser.parse(timestamp, text)
+    def _parse(self, new_lines):
+        dispatch = self._dispatcher.dispatch
+        for timestamp, text in new_lines:  # [(datetime, text), ...]
+            dispatch(timestamp, text)
+
+    def _toggle_clickthrough(self, parser, timestamp, text):
+        config.data[parser.name]['clickthrough'] = (
+            not config.data[parser.name]['clickthrough'])
+        config.save()
+        parser._set_flags()
+
+    def _toggle_parser(self, parser, timestamp, text):
+        parser.toggle()
 
     def _menu(self, event):
         """Returns a new QMenu for system tray."""
@@ -0,0 +1,93 @@
+"""
+Per log file read checkpoints to provide checkpoints.data
+
+Each eqlog file is keyed by its absolute path and records the inode and size
+of the file, the byte offset read up to and the timestamp of the last line
+read, so that LogReader can resume exactly where it left off after a restart.
+"""
+import json
+import os
+import threading
+
+data = {}
+_filename = ''
+_dirty = False
+_lock = threading.Lock()  # checkpoints are updated from the log tail thread
+
+
+def load(filename):
+    """
+    Load json from file.
+    """
+    global data
+    global _filename
+    global _dirty
+    _filename = filename
+    _dirty = False
+
+    try:
+        with open(_filename, 'r') as f:
+            data = json.loads(f.read())
+    except:
+        # nparse.checkpoints.json does not exist, start without checkpoints
+        data = {}
+
+
+def save():
+    """
+    Saves json to previously opened location if any checkpoint has changed.
+    """
+    global _dirty
+    with _lock:
+        if not _dirty or not _filename:
+            return
+        text = json.dumps(data, indent=4, sort_keys=True)
+        _dirty = False
+    # write a temporary file and swap it in, so a crash mid write cannot
+    # leave a truncated checkpoint file behind
+    temp_filename = _filename + '.tmp'
+    with open(temp_filename, mode='w') as f:
+        f.write(text)
+    os.replace(temp_filename, _filename)
+
+
+def update(log_file, offset, timestamp):
+    """
+    Records that log_file has been read up to byte offset, the last line read
+    carrying the EQ timestamp 'timestamp' (ie. '[Mon Jan 01 00:00:00 2024]').
+    """
+    global _dirty
+    stat = os.stat(log_file)
+    with _lock:
+        data[os.path.abspath(log_file)] = {
+            'inode': stat.st_ino,
+            'size': stat.st_size,
+            'offset': offset,
+            'timestamp': timestamp,
+        }
+        _dirty = True
+
+
+def resume_offset(log_file):
+    """
+    Returns the checkpointed byte offset for log_file, or None if there is no
+    checkpoint or the file has since been replaced, truncated or rewritten.
+    """
+    checkpoint = data.get(os.path.abspath(log_file))
+    if not checkpoint:
+        return None
+    try:
+        stat = os.stat(log_file)
+        offset = int(checkpoint['offset'])
+        if stat.st_ino != checkpoint['inode'] or stat.st_size < offset:
+            return None
+        if offset and checkpoint['timestamp']:
+            # the line ending at offset should be the last line read
+            with open(log_file, 'rb') as log:
+                log.seek(max(offset - 1000, 0), os.SEEK_SET)
+                last_line = log.read(offset - log.tell()).rstrip(b'\r\n').rsplit(b'\n', 1)[-1]
+            if not last_line.startswith(checkpoint['timestamp'].encode()):
+                return None
+    except (OSError, KeyError, TypeError, ValueError):
+        return None
+    return offset
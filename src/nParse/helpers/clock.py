@@ -0,0 +1,61 @@
+"""
+Application wide clock used by timers, replaced with a VirtualClock when
+replaying a log so that time follows the log instead of the wall clock.
+"""
+import datetime
+import time
+
+
+class Clock:
+    """Wall clock time."""
+
+    speed = 1.0  # virtual seconds per real second, 0 is as fast as possible
+
+    def now(self):
+        return datetime.datetime.now()
+
+    def to_real_msec(self, msec):
+        """Converts a virtual duration in msec to real msec, None if it never elapses."""
+        return msec
+
+
+class VirtualClock(Clock):
+    """Clock driven by log timestamps, running 'speed' times faster than real time."""
+
+    def __init__(self, start, speed=1.0):
+        self.speed = speed
+        self._time = start
+        self._real = time.monotonic()
+
+    def now(self):
+        if not self.speed:
+            return self._time
+        return self._time + datetime.timedelta(
+            seconds=(time.monotonic() - self._real) * self.speed)
+
+    def set(self, timestamp):
+        """Advances the clock to timestamp, never moving it backwards."""
+        self._time = max(timestamp, self.now())
+        self._real = time.monotonic()
+
+    def to_real_msec(self, msec):
+        if not self.speed:
+            return None
+        return msec / self.speed
+
+
+_clock = Clock()
+
+
+def install(clock):
+    """Replaces the application clock."""
+    global _clock
+    _clock = clock
+
+
+def now():
+    return _clock.now()
+
+
+def to_real_msec(msec):
+    return _clock.to_real_msec(msec)
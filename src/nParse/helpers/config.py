@@ -1,6 +1,7 @@
 """
 General global settings setup to provide settings.data
 """
+import codecs
 import os
 from glob import glob
 import json
@@ -31,12 +32,23 @@ def load(filename):
 
 def save():
     """
-    Saves json to previously opened location.
+    Saves json to previously opened location, if any.
     """
+    if not _filename:
+        return
     with open(_filename, mode='w') as f:
         f.write(json.dumps(data, indent=4, sort_keys=True))
 
 
+def keep_in_memory():
+    """
+    Stops save() from writing, so changes made from here on last only as long
+    as the running instance.
+    """
+    global _filename
+    _filename = ''
+
+
 def verify_settings():
     # verify nparse.config.json contains what it should and
     # set defaults if appropriate
@@ -55,6 +67,15 @@ def verify_settings():
         data['general'].get('update_check', True),
         True
     )
+    data['general']['resume_log_position'] = get_setting(
+        data['general'].get('resume_log_position', True),
+        True
+    )
+    data['general']['log_encoding'] = get_setting(
+        data['general'].get('log_encoding', 'cp1252'),
+        'cp1252',
+        is_encoding
+    )
 
     # sharing
     data['sharing'] = data.get('sharing', {})
@@ -155,6 +176,15 @@ def verify_settings():
         data['maps'].get('toggled', True),
         True
         )
+    data['maps']['zone_cache_size'] = get_setting(
+        data['maps'].get('zone_cache_size', 32),
+        32,
+        lambda x: (0 <= x <= 1024)
+        )
+    data['maps']['zone_links'] = get_setting(
+        data['maps'].get('zone_links', {}),
+        {}
+        )
     data['maps']['use_z_layers'] = get_setting(
         data['maps'].get('use_z_layers', False),
         False
@@ -219,6 +249,20 @@ def verify_settings():
         1,
         lambda x: (1 <= x <= 65)
         )
+    data['spells']['max_targets'] = get_setting(
+        data['spells'].get('max_targets', 0),
+        0,
+        lambda x: (0 <= x <= 1000)
+        )
+    data['spells']['memory_budget'] = get_setting(
+        data['spells'].get('memory_budget', 0),
+        0,
+        lambda x: (0 <= x <= 1024)
+        )
+    data['spells']['restore_timers'] = get_setting(
+        data['spells'].get('restore_timers', True),
+        True
+        )
     data['spells']['toggled'] = get_setting(
         data['spells'].get('toggled', True),
         True
@@ -231,6 +275,14 @@ def verify_settings():
         data['spells'].get('use_item_triggers', False),
         False
         )
+    data['spells']['use_timer_list'] = get_setting(
+        data['spells'].get('use_timer_list', False),
+        False
+        )
+    data['spells']['use_other_triggers'] = get_setting(
+        data['spells'].get('use_other_triggers', False),
+        False
+        )
     data['spells']['use_custom_triggers'] = get_setting(
         data['spells'].get('use_custom_triggers', True),
         True
@@ -327,6 +379,14 @@ def get_setting(setting, default, func=None):
         return default
 
 
+def is_encoding(name):
+    try:
+        codecs.lookup(name)
+    except LookupError:
+        return False
+    return True
+
+
 def verify_paths():
     # verify eq log directory exists
     try:
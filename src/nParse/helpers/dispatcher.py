@@ -0,0 +1,68 @@
+"""Routes log lines to the parser handlers registered for them."""
+
+
+class LineDispatcher:
+    """
+    Handlers are registered for the literal prefix of the lines they care about
+    and are indexed by the first word of that prefix, so a line only reaches the
+    handlers that can match it.  Prefixes without a space may end mid-word
+    (ie. 'start_recording_') and are checked together with one startswith.
+
+    Handlers are called as handler(timestamp, text), regex handlers as
+    handler(timestamp, text, match).  An optional guard() returning False
+    skips the handler, ie. while its parser is toggled off.
+    """
+
+    def __init__(self):
+        self._defaults = []  # [(handler, guard)], called for every line
+        self._words = {}  # first word: [(prefix, handler, guard)]
+        self._partials = {}  # prefix: [(handler, guard)]
+        self._partial_prefixes = ()
+
+    def add_default(self, handler, guard=None):
+        """Registers handler for every line."""
+        self._defaults.append((handler, guard))
+
+    def add_prefix(self, prefix, handler, guard=None):
+        """Registers handler for lines starting with prefix."""
+        space = prefix.find(' ')
+        if space > 0:
+            self._words.setdefault(prefix[:space], []).append((prefix, handler, guard))
+        else:
+            self._partials.setdefault(prefix, []).append((handler, guard))
+            self._partial_prefixes = tuple(self._partials)
+
+    def add_regex(self, regex, handler, prefix=None, guard=None):
+        """
+        Registers handler for lines matching the compiled regex.  The literal
+        prefix every match starts with should be given when there is one,
+        otherwise the regex is tried against every line.
+        """
+        def match(timestamp, text):
+            result = regex.match(text)
+            if result:
+                handler(timestamp, text, result)
+
+        if prefix:
+            self.add_prefix(prefix, match, guard)
+        else:
+            self.add_default(match, guard)
+
+    def dispatch(self, timestamp, text):
+        for handler, guard in self._defaults:
+            if guard is None or guard():
+                handler(timestamp, text)
+
+        space = text.find(' ')
+        handlers = self._words.get(text[:space] if space > 0 else text)
+        if handlers:
+            for prefix, handler, guard in handlers:
+                if text.startswith(prefix) and (guard is None or guard()):
+                    handler(timestamp, text)
+
+        if self._partial_prefixes and text.startswith(self._partial_prefixes):
+            for prefix, handlers in self._partials.items():
+                if text.startswith(prefix):
+                    for handler, guard in handlers:
+                        if guard is None or guard():
+                            handler(timestamp, text)
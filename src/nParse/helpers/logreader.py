@@ -1,19 +1,106 @@
 from datetime import datetime
 from glob import glob
 import os
+import queue
 
-from PySide6.QtCore import QFileSystemWatcher, Signal, QObject
+from PySide6.QtCore import QFileSystemWatcher, Signal, QObject, QThread, QTimer
 from PySide6.QtWidgets import QApplication
 
-from nParse.helpers import strip_timestamp
+from nParse.helpers import config, checkpoints, strip_timestamp, TimestampParser
+
+CHECKPOINT_FILE = 'nparse.checkpoints.json'
+CHECKPOINT_INTERVAL = 30000  # msec
+READ_SIZE = 1 << 20  # maximum bytes read from a log file at once
 
 class LogReaderSignals(QObject):
-    new_line = Signal(object)
+    new_lines = Signal(object)  # [(datetime, text), ...]
     character_updated = Signal(str)
     server_updated = Signal(str)
     def __init__(self):
         super().__init__()
 
+class LogFile:
+    """Incrementally reads complete lines from a log file."""
+
+    def __init__(self, path, offset=0, encoding='cp1252'):
+        self.path = path
+        self.offset = offset  # bytes read from file, including _carry
+        self.encoding = encoding
+        self._carry = b''  # trailing line still being written
+
+    @property
+    def checkpoint(self):
+        """Offset just past the last complete line returned."""
+        return self.offset - len(self._carry)
+
+    def read(self):
+        """
+        Returns a list of complete lines from at most READ_SIZE new bytes, or
+        None if nothing new has been written since the last read.
+        """
+        with open(self.path, 'rb') as log:
+            log.seek(0, os.SEEK_END)
+            if log.tell() < self.offset:  # truncated, start over
+                self.offset, self._carry = 0, b''
+            log.seek(self.offset, os.SEEK_SET)
+            chunk = log.read(READ_SIZE)
+        if not chunk:
+            return None
+        self.offset += len(chunk)
+        buffer = self._carry + chunk
+        end = buffer.rfind(b'\n') + 1
+        if not end and len(buffer) < READ_SIZE:
+            self._carry = buffer
+            return []
+        if not end:  # no line ending in sight, do not buffer forever
+            end = len(buffer)
+        complete, self._carry = buffer[:end], buffer[end:]
+        # split on line feeds only, str.splitlines() would also split on the
+        # likes of form feeds, and only when the whole chunk decodes
+        lines = complete.split(b'\n')
+        if not lines[-1]:
+            lines.pop()
+        try:
+            return [line.rstrip(b'\r').decode(self.encoding) for line in lines]
+        except UnicodeDecodeError:
+            return [
+                line.rstrip(b'\r').decode(self.encoding, errors='replace')
+                for line in lines
+            ]
+
+
+class LogTail(QThread):
+    """Reads changed log files off the GUI thread."""
+
+    def __init__(self, read):
+        super().__init__()
+        self._read = read  # callable(changed_file)
+        self._changes = queue.Queue()
+
+    def notify(self, changed_file):
+        self._changes.put(changed_file)
+
+    def stop(self):
+        self._changes.put(None)
+        self.wait()
+
+    def run(self):
+        while True:
+            changed_files = [self._changes.get()]
+            # collapse notifications that queued up while reading
+            while True:
+                try:
+                    changed_file = self._changes.get_nowait()
+                except queue.Empty:
+                    break
+                if changed_file not in changed_files:
+                    changed_files.append(changed_file)
+            if None in changed_files:
+                return
+            for changed_file in changed_files:
+                self._read(changed_file)
+
+
 class LogReader(QFileSystemWatcher):
     character_name = None
     server_name = None
@@ -24,14 +111,34 @@ class LogReader(QFileSystemWatcher):
         self._eq_directory = eq_directory
         self._files = glob(os.path.join(eq_directory, 'eqlog_*_*.txt'))
         self._watcher = QFileSystemWatcher(self._files)
-        self._watcher.fileChanged.connect(self._file_changed_safe_wrap)
+        self._tail = LogTail(self._file_changed_safe_wrap)
+        self._watcher.fileChanged.connect(self._tail.notify)
         self._dir_watcher = QFileSystemWatcher([eq_directory])
         self._dir_watcher.directoryChanged.connect(self._dir_changed)
 
-        self._stats = {
-            'log_file': '',
-            'last_read': 0,
-        }
+        self._log = None  # LogFile
+        self._timestamps = TimestampParser()
+
+        # Periodically persist how far each log has been read
+        checkpoints.load(CHECKPOINT_FILE)
+        self._checkpoint_timer = QTimer()
+        self._checkpoint_timer.timeout.connect(self.save_checkpoints)
+        self._checkpoint_timer.start(CHECKPOINT_INTERVAL)
+        QApplication.instance().aboutToQuit.connect(self.stop)
+
+        self._tail.start()
+
+    def stop(self):
+        """Stops the tail thread and saves checkpoints, call before deleting."""
+        if self._tail.isRunning():
+            self._tail.stop()
+        self.save_checkpoints()
+
+    def save_checkpoints(self):
+        try:
+            checkpoints.save()
+        except OSError as e:
+            print("Failed to save log checkpoints: %s" % e)
 
     def _dir_changed(self, changed_dir):
         print("Directory '%s' updated, refreshing file list..." % changed_dir)
@@ -48,11 +155,10 @@ class LogReader(QFileSystemWatcher):
         try:
             self._file_changed(changed_file)
         except FileNotFoundError:
-            print("File not found: %s; did it move?")
+            print("File not found: %s; did it move?" % changed_file)
 
     def _file_changed(self, changed_file):
-        if changed_file != self._stats['log_file']:
-            self._stats['log_file'] = changed_file
+        if not self._log or changed_file != self._log.path:
             char_name = os.path.basename(changed_file).split("_")[1]
             server_name = os.path.basename(changed_file).split("_")[2][:-4]
             if server_name != self.server_name:
@@ -61,25 +167,37 @@ class LogReader(QFileSystemWatcher):
             if char_name != self.character_name:
                 self.character_name = char_name
                 QApplication.instance()._signals["logreader"].character_updated.emit(char_name)
-            with open(self._stats['log_file'], 'rb') as log:
-                log.seek(0, os.SEEK_END)
-                current_end = log.tell()
-                log.seek(max(log.tell() - 1000, 0), os.SEEK_SET)
-                for line in log:
-                    if line.endswith(b'] Welcome to EverQuest!\r\n'):
-                        break
-                self._stats['last_read'] = min(log.tell(), current_end)
-
-        with open(self._stats['log_file']) as log:
-            try:
-                log.seek(self._stats['last_read'], os.SEEK_SET)
-                lines = log.readlines()
-                self._stats['last_read'] = log.tell()
-                for line in lines:
-                    QApplication.instance()._signals["logreader"].new_line.emit((
-                        datetime.now(),
-                        strip_timestamp(line)
-                        ))
-            except Exception:  # do not read lines if they cause errors
-                log.seek(0, os.SEEK_END)
-                self._stats['last_read'] = log.tell()
+            resume_offset = None
+            if config.data['general']['resume_log_position']:
+                resume_offset = checkpoints.resume_offset(changed_file)
+            if resume_offset is None:
+                with open(changed_file, 'rb') as log:
+                    log.seek(0, os.SEEK_END)
+                    current_end = log.tell()
+                    log.seek(max(log.tell() - 1000, 0), os.SEEK_SET)
+                    for line in log:
+                        if line.endswith(b'] Welcome to EverQuest!\r\n'):
+                            break
+                    resume_offset = min(log.tell(), current_end)
+            self._log = LogFile(
+                changed_file, resume_offset, config.data['general']['log_encoding'])
+
+        while True:
+            lines = self._log.read()
+            if lines is None:
+                break
+            if lines:
+                checkpoints.update(
+                    self._log.path,
+                    self._log.checkpoint,
+                    lines[-1][:lines[-1].find(']') + 1]
+                )
+                QApplication.instance()._signals["logreader"].new_lines.emit([
+                    (self._timestamp(line), strip_timestamp(line)) for line in lines
+                ])
+
+    def _timestamp(self, line):
+        try:
+            return self._timestamps.parse(line)
+        except ValueError:
+            return datetime.now()
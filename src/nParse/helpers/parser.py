@@ -128,6 +128,14 @@ class ParserWindow(QWidget):
         if requies_redraw:
             self.show()
 
+    def register(self, dispatcher):
+        """Registers line handlers with a LineDispatcher, by default every line goes to parse()."""
+        dispatcher.add_default(self.parse, self.parsing)
+
+    def parsing(self):
+        """Returns True while log lines should be sent to this parser."""
+        return config.data[self.name]['toggled']
+
     def _save_geometry(self):
         config.data[self.name]['geometry'] = [
             self.geometry().x(), self.geometry().y(),
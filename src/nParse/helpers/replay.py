@@ -0,0 +1,89 @@
+"""Replays a recorded eqlog through the parsers on a virtual clock."""
+import collections
+import math
+import time
+
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtWidgets import QApplication
+
+from nParse.helpers import clock, config, strip_timestamp, TimestampParser
+from nParse.helpers.logreader import LogFile
+
+
+class LogReplay(QObject):
+    """
+    Emits the lines of log_file on the logreader new_lines signal, one batch per
+    log second, paced by their timestamps at 'speed' times real time.  A speed
+    of 0 replays as fast as possible.
+    """
+
+    finished = Signal()
+
+    def __init__(self, log_file, speed=1.0):
+        super().__init__()
+        self.speed = speed
+        self.lines = 0
+        self.elapsed = 0.0  # real seconds taken by the replay
+        self._log = LogFile(log_file, 0, config.data['general']['log_encoding'])
+        self._timestamps = TimestampParser()
+        self._pending = collections.deque()  # (datetime, text)
+        self._end_of_log = False
+        self._clock = None  # VirtualClock
+        self._started = None
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._step)
+
+    def start(self):
+        self._started = time.monotonic()
+        self._step()
+
+    def stop(self):
+        self._timer.stop()
+        clock.install(clock.Clock())
+
+    def _fill(self):
+        while not self._pending and not self._end_of_log:
+            lines = self._log.read()
+            if lines is None:
+                self._end_of_log = True
+                break
+            for line in lines:
+                try:
+                    timestamp = self._timestamps.parse(line)
+                except ValueError:
+                    continue  # nothing to place it in time with
+                self._pending.append((timestamp, strip_timestamp(line)))
+
+    def _step(self):
+        self._fill()
+        if not self._pending:
+            self.elapsed = time.monotonic() - self._started
+            self.stop()
+            self.finished.emit()
+            return
+
+        timestamp = self._pending[0][0]
+        if not self._clock:
+            self._clock = clock.VirtualClock(timestamp, self.speed)
+            clock.install(self._clock)
+        elif self.speed and timestamp > self._clock.now():
+            # woke up early, wait for the clock to catch up
+            self._timer.start(math.ceil(
+                clock.to_real_msec((timestamp - clock.now()).total_seconds() * 1000)))
+            return
+        self._clock.set(timestamp)
+
+        batch = []
+        while self._pending and self._pending[0][0] == timestamp:
+            batch.append(self._pending.popleft())
+            if not self._pending:
+                self._fill()
+        self.lines += len(batch)
+        QApplication.instance()._signals["logreader"].new_lines.emit(batch)
+
+        delay = 0
+        if self._pending and self.speed:
+            delay = clock.to_real_msec(
+                (self._pending[0][0] - clock.now()).total_seconds() * 1000)
+        self._timer.start(max(math.ceil(delay), 0))
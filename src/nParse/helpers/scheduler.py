@@ -0,0 +1,119 @@
+"""
+Shared timer for countdown widgets, so that they all tick together from one
+QTimer instead of each re-arming its own every second.
+"""
+import heapq
+import itertools
+import time
+import weakref
+
+from PySide6.QtCore import QTimer
+
+TICK = 1000  # msec
+SLACK = 50  # msec, deadlines this close to the tick run with it
+
+
+class TickScheduler:
+    """
+    Calls each added callback every interval until it returns False, its
+    object is garbage collected or its Qt object has been deleted.
+
+    Bound methods are held by weak reference so that a removed widget is
+    dropped rather than kept alive by its own countdown.
+    """
+
+    def __init__(self):
+        self._heap = []  # [(deadline, sequence)]
+        self._entries = {}  # sequence: (weakref, interval)
+        self._sequences = {}  # weakref: sequence, to add a callback once
+        self._counter = itertools.count()
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._tick)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, callback, interval=TICK):
+        """
+        Calls callback() every interval msec, starting with the next tick
+        due within one interval from now.
+        """
+        if hasattr(callback, '__self__'):
+            ref = weakref.WeakMethod(callback)
+        else:
+            ref = weakref.ref(callback)
+        if ref in self._sequences:
+            return
+        sequence = next(self._counter)
+        self._sequences[ref] = sequence
+        self._entries[sequence] = (ref, interval)
+        now = time.monotonic()
+        if self._heap and (self._heap[0][0] - now) * 1000 < interval:
+            # line up with the next tick so that countdowns change together
+            deadline = self._heap[0][0]
+            if deadline < now + SLACK / 1000:
+                deadline += interval / 1000
+        else:
+            deadline = now + interval / 1000
+        heapq.heappush(self._heap, (deadline, sequence))
+        self._arm()
+
+    def remove(self, callback):
+        if hasattr(callback, '__self__'):
+            ref = weakref.WeakMethod(callback)
+        else:
+            ref = weakref.ref(callback)
+        sequence = self._sequences.pop(ref, None)
+        if sequence is not None:
+            del self._entries[sequence]
+
+    def _arm(self):
+        while self._heap and self._heap[0][1] not in self._entries:
+            heapq.heappop(self._heap)  # removed
+        if not self._heap:
+            self._timer.stop()
+            return
+        msec = max(int((self._heap[0][0] - time.monotonic()) * 1000), 0)
+        if not self._timer.isActive() or self._timer.remainingTime() > msec:
+            self._timer.start(msec)
+
+    def _tick(self):
+        now = time.monotonic()
+        while self._heap and self._heap[0][0] <= now + SLACK / 1000:
+            deadline, sequence = heapq.heappop(self._heap)
+            entry = self._entries.get(sequence)
+            if not entry:
+                continue
+            ref, interval = entry
+            callback = ref()
+            keep = False
+            if callback:
+                try:
+                    keep = callback() is not False
+                except RuntimeError:
+                    pass  # Qt object already deleted
+            if keep and sequence in self._entries:
+                deadline += interval / 1000
+                if deadline <= now:
+                    deadline = now + interval / 1000  # fell behind, skip ticks
+                heapq.heappush(self._heap, (deadline, sequence))
+            elif sequence in self._entries:
+                del self._entries[sequence]
+                del self._sequences[ref]
+        self._arm()
+
+
+_scheduler = None
+
+
+def add(callback, interval=TICK):
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = TickScheduler()
+    _scheduler.add(callback, interval)
+
+
+def remove(callback):
+    if _scheduler is not None:
+        _scheduler.remove(callback)
@@ -41,6 +41,34 @@ you by other players. WARNING: This option is very buggy. Use it at your own ris
 spell durations at all costs. There will be other strange behavior.
 """.replace('\n', ' ')
 
+WHATS_THIS_OTHER_TRIGGERS = """Track spells landing on other players and mobs, whoever cast them, from lines such as
+"Soandso's skin turns to stone." Durations are based on your own level, as the caster's level is not known.
+""".replace('\n', ' ')
+
+WHATS_THIS_TIMER_LIST = """Draws all spell timers in one compact list instead of a widget per spell, which uses much
+less CPU and memory when tracking many targets, ie. in a raid. Takes effect when nParse is restarted.
+""".replace('\n', ' ')
+
+WHATS_THIS_RESTORE_TIMERS = """Active spell timers are saved while nParse runs and when it quits. When set, they are
+restored at startup, leaving out any that have run out in the meantime.
+""".replace('\n', ' ')
+
+WHATS_THIS_MAX_TARGETS = """The most targets the spells window keeps. When a new target would go over the limit, the
+target updated least recently is removed. You and custom timers are always kept. 0 is no limit.
+""".replace('\n', ' ')
+
+WHATS_THIS_MEMORY_BUDGET = """An estimate of the most memory the spell timers may use, in MiB. Targets updated least
+recently are removed to stay within it. 0 is no limit.
+""".replace('\n', ' ')
+
+WHATS_THIS_ZONE_CACHE = """An estimate of the most memory kept for recently visited zones, in MiB, so their maps show
+instantly when you return. Zones you have zoned between before are also loaded ahead of time. 0 turns this off.
+""".replace('\n', ' ')
+
+WHATS_THIS_RESUME_LOG = """nParse remembers how far it has read each log file. When set, a restart will continue
+reading from that point so no lines are missed or read twice. Otherwise only lines written since your last login are read.
+""".replace('\n', ' ')
+
 WHATS_THIS_SHARING = """Your location can be shared with others via a central location server. If you enable this, you
 agree to send and receive location data via a third-party server. The only data other players can see is your character
 name and the zone+loc you send. Nothing personally identifiable will be visible beyond this.
@@ -185,6 +213,10 @@ class SettingsWindow(QDialog):
         gsl_update_check = QCheckBox()
         gsl_update_check.setObjectName('general:update_check')
         gsl.addRow('Check for Updates', gsl_update_check)
+        gsl_resume_log_position = QCheckBox()
+        gsl_resume_log_position.setWhatsThis(WHATS_THIS_RESUME_LOG)
+        gsl_resume_log_position.setObjectName('general:resume_log_position')
+        gsl.addRow('Resume Log Position', gsl_resume_log_position)
         gsl.addRow(SettingsHeader('parsers'))
         gsl_window_flush = QCheckBox()
         gsl_window_flush.setObjectName('general:window_flush')
@@ -211,6 +243,20 @@ class SettingsWindow(QDialog):
             'Casting Window Buffer (msec 1-4000)',
             ssl_casting_window_buffer
             )
+        ssl_restore_timers = QCheckBox()
+        ssl_restore_timers.setWhatsThis(WHATS_THIS_RESTORE_TIMERS)
+        ssl_restore_timers.setObjectName('spells:restore_timers')
+        ssl.addRow('Restore Timers', ssl_restore_timers)
+        ssl_max_targets = QSpinBox()
+        ssl_max_targets.setWhatsThis(WHATS_THIS_MAX_TARGETS)
+        ssl_max_targets.setRange(0, 1000)
+        ssl_max_targets.setObjectName('spells:max_targets')
+        ssl.addRow('Maximum Targets (0 for no limit)', ssl_max_targets)
+        ssl_memory_budget = QSpinBox()
+        ssl_memory_budget.setWhatsThis(WHATS_THIS_MEMORY_BUDGET)
+        ssl_memory_budget.setRange(0, 1024)
+        ssl_memory_budget.setObjectName('spells:memory_budget')
+        ssl.addRow('Memory Budget (MiB, 0 for no limit)', ssl_memory_budget)
         ssl_open_custom = QPushButton("Edit")
         ssl_open_custom.clicked.connect(self._get_custom_timers)
         ssl.addRow('Custom Timers', ssl_open_custom)
@@ -224,6 +270,14 @@ class SettingsWindow(QDialog):
         ssl_item_trigger_mode.setWhatsThis(WHATS_THIS_ITEM_TRIGGERS)
         ssl_item_trigger_mode.setObjectName('spells:use_item_triggers')
         ssl.addRow('Permissive Item Triggers', ssl_item_trigger_mode)
+        ssl_other_trigger_mode = QCheckBox()
+        ssl_other_trigger_mode.setWhatsThis(WHATS_THIS_OTHER_TRIGGERS)
+        ssl_other_trigger_mode.setObjectName('spells:use_other_triggers')
+        ssl.addRow('Track Spells On Others', ssl_other_trigger_mode)
+        ssl_timer_list_mode = QCheckBox()
+        ssl_timer_list_mode.setWhatsThis(WHATS_THIS_TIMER_LIST)
+        ssl_timer_list_mode.setObjectName('spells:use_timer_list')
+        ssl.addRow('Compact Timer List', ssl_timer_list_mode)
         spells_settings.setLayout(ssl)
 
         stacked_widgets.append(('Spells', spells_settings))
@@ -244,6 +298,12 @@ class SettingsWindow(QDialog):
         msl_grid_line_width.setSingleStep(1)
         msl.addRow('Grid Line Width', msl_grid_line_width)
 
+        msl_zone_cache_size = QSpinBox()
+        msl_zone_cache_size.setWhatsThis(WHATS_THIS_ZONE_CACHE)
+        msl_zone_cache_size.setRange(0, 1024)
+        msl_zone_cache_size.setObjectName('maps:zone_cache_size')
+        msl.addRow('Zone Cache (MiB, 0 to disable)', msl_zone_cache_size)
+
         msl.addRow(SettingsHeader('z levels'))
 
         msl_current_z_alpha = QSpinBox()
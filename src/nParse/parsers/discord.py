@@ -250,5 +250,5 @@ class Discord(ParserWindow):
             'name': 'hideheader', 'new_css': CSS_HIDE_HEADER}
         webview.page().runJavaScript(hide_header)
 
-    def parse(self, timestamp, text):
-        pass
+    def register(self, dispatcher):
+        pass  # the overlay does not read the log
@@ -0,0 +1,111 @@
+"""
+Compiled map files.
+
+The L and P lines of a zone's map files are packed into arrays and pickled to
+data/maps/map_cache/<zone>.cache, so a zone is loaded with a single read
+instead of parsing every line of text.  A cache is rebuilt when any of the
+map files it was built from is added, removed or modified.
+
+Build the cache of every zone ahead of time with:
+    python -m nParse.parsers.maps.mapcache
+"""
+import os
+import pathlib
+import pickle
+import threading
+from array import array
+
+MAP_CACHE_LOCATION = 'data/maps/map_cache'
+MAP_CACHE_VERSION = 2
+
+
+class ZoneMap:
+    """
+    The lines and points of interest of a zone, as plain data.
+
+    lines holds x1, y1, z1, x2, y2, z2 and line_colors r, g, b of each line,
+    poi holds x, y, z and poi_colors r, g, b of each point of interest.
+    """
+
+    __slots__ = ('lines', 'line_colors', 'poi', 'poi_colors', 'poi_sizes', 'poi_texts')
+
+    def __init__(self):
+        self.lines = array('d')
+        self.line_colors = array('B')
+        self.poi = array('d')
+        self.poi_colors = array('B')
+        self.poi_sizes = array('i')
+        self.poi_texts = []
+
+    def __len__(self):
+        return len(self.lines) // 6
+
+    def parse(self, map_file):
+        """Adds the L and P lines of map_file."""
+        with open(map_file, 'r') as f:
+            for line in f:
+                line_type = line[0:1].lower()
+                if line_type == 'l':  # x1, y1, z1, x2, y2, z2, r, g, b
+                    data = line[1:].split(',')
+                    self.lines.extend(map(float, data[0:6]))
+                    self.line_colors.extend(map(int, data[6:9]))
+                elif line_type == 'p':  # x, y, z, r, g, b, size, text
+                    data = line[1:].split(',')
+                    self.poi.extend(map(float, data[0:3]))
+                    self.poi_colors.extend(map(int, data[3:6]))
+                    self.poi_sizes.append(int(data[6]))
+                    self.poi_texts.append(data[7].strip())
+
+
+def get_map_files(map_files_location, map_file_name):
+    """Returns the sorted paths of every map file of map_file_name."""
+    return sorted(pathlib.Path(map_files_location).glob(
+        '**/{zone}*.txt'.format(zone=map_file_name)))
+
+
+def load_zone_map(map_files_location, map_file_name):
+    """
+    Returns the ZoneMap of map_file_name, from its cache when that was built
+    from the current map files, otherwise parsed and cached.
+    """
+    map_files = get_map_files(map_files_location, map_file_name)
+    source = [MAP_CACHE_VERSION]
+    for map_file in map_files:
+        stat = os.stat(map_file)
+        source.append((str(map_file), stat.st_mtime_ns, stat.st_size))
+
+    cache_file_name = os.path.join(MAP_CACHE_LOCATION, '{}.cache'.format(map_file_name))
+    try:
+        with open(cache_file_name, 'rb') as cache_file:
+            cache = pickle.loads(cache_file.read())
+        if cache['source'] == source:
+            return cache['map']
+    except Exception:
+        pass  # missing, outdated or unreadable cache, rebuild below
+
+    zone_map = ZoneMap()
+    for map_file in map_files:
+        print("Loading: %s" % map_file)
+        zone_map.parse(map_file)
+    # written aside and swapped in, so neither a crash nor the map loader
+    # caching the same zone at the same time can leave a corrupt cache
+    temp_file_name = '{}.{}.tmp'.format(cache_file_name, threading.get_ident())
+    try:
+        os.makedirs(MAP_CACHE_LOCATION, exist_ok=True)
+        with open(temp_file_name, 'wb') as cache_file:
+            pickle.dump({'source': source, 'map': zone_map}, cache_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file_name, cache_file_name)
+    except OSError as e:
+        print("Failed to write map cache: %s" % e)
+    return zone_map
+
+
+def build_all():
+    """Builds the cache of every zone in map_keys.ini."""
+    from nParse.parsers.maps.mapdata import MAP_FILES_LOCATION, MapData
+    for map_file_name in sorted(set(MapData.get_zone_dict().values())):
+        load_zone_map(MAP_FILES_LOCATION, map_file_name)
+
+
+if __name__ == '__main__':
+    build_all()
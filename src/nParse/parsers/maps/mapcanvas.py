@@ -6,13 +6,14 @@ import os
 import pathvalidate
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QPainter, QTransform, QColor, QPen, QAction
-from PySide6.QtWidgets import (QGraphicsScene, QGraphicsView, QInputDialog,
+from PySide6.QtWidgets import (QApplication, QGraphicsScene, QGraphicsView, QInputDialog,
                              QMenu, QLineEdit, QGraphicsPathItem)
 
 from nParse.helpers import config, to_range, text_time_to_seconds
 from nParse.parsers.maps.mapclasses import (MapPoint, WayPoint, Player, SpawnPoint, MouseLocation,
                          PointOfInterest, UserWaypoint)
-from nParse.parsers.maps.mapdata import MapData, MAP_FILES_PATHLIB, ICON_MAP
+from nParse.parsers.maps.mapdata import MapData, MAP_FILES_PATHLIB, ICON_MAP, add_lines, load_zone_layout
+from nParse.parsers.maps.maploader import MapLoader, ZoneCache
 
 
 class MapCanvas(QGraphicsView):
@@ -40,15 +41,75 @@ class MapCanvas(QGraphicsView):
         self._path_recording_name = ""
         self._path_file = None
         self._path_last_loc = None
+        self._updated = {}  # part of the map: inputs it was last updated with
+        # zones load in the background while the current map stays up
+        self._loader = MapLoader()
+        self._loader.loaded.connect(self._map_loaded)
+        self._loading_zone = None
+        self._loading_keep_loc = False
+        self._pending = []  # [(method, args)] called once the map has loaded
+        self._zones = ZoneCache()
+        QApplication.instance().aboutToQuit.connect(self._loader.stop)
+
+    @property
+    def zone(self):
+        """The zone being loaded, else the zone shown."""
+        if self._loading_zone is not None:
+            return self._loading_zone
+        return self._data.zone if self._data else None
+
+    @property
+    def loading(self):
+        """Whether a requested map has not been shown yet."""
+        return self._loading_zone is not None
 
     def load_map(self, map_name, keep_loc=False):
+        map_name = str(map_name)
+        layout = self._zones.get(map_name)
+        if layout is None and self._data is None:
+            # nothing to keep on screen, load right away
+            try:
+                layout = load_zone_layout(map_name)
+            except:
+                traceback.print_exc()
+                return
+        if layout is not None:
+            self._loading_zone = None
+            self._show_map(map_name, layout, keep_loc)
+            self._apply_pending()
+            return
+
+        if self._loading_zone is not None and map_name.lower() == self._loading_zone.lower():
+            return  # already on its way
+        self._loading_zone = map_name
+        self._loading_keep_loc = keep_loc
+        self._loader.request(map_name)
+
+    def _map_loaded(self, map_name, layout):
+        if layout is not None:
+            self._zones.add(layout)
+        if map_name != self._loading_zone:
+            return  # prefetched, or another zone was requested since
+        self._loading_zone = None
+        if layout is not None:
+            self._show_map(map_name, layout, self._loading_keep_loc)
+        self._apply_pending()
+
+    def _apply_pending(self):
+        """Applies what came in while loading."""
+        pending, self._pending = self._pending, []
+        for method, args in pending:
+            method(*args)
+
+    def _show_map(self, map_name, layout, keep_loc):
         old_player_data = None
+        old_zone = self._data.zone if self._data else None
         try:
             try:
                 old_player_data = self._data.players['__you__']
             except:
                 pass  # no old location for player
-            map_data = MapData(str(map_name))
+            map_data = MapData(map_name, layout)
 
         except:
             traceback.print_exc()
@@ -56,6 +117,7 @@ class MapCanvas(QGraphicsView):
         else:
             self._data = map_data
             self._scene.clear()
+            self._updated = {}
             self._z_index = 0
             self._draw()
             rect = self._scene.sceneRect()
@@ -71,6 +133,11 @@ class MapCanvas(QGraphicsView):
             )
             self._mouse_location = MouseLocation()
             self._scene.addItem(self._mouse_location)
+            self._zones.add(layout)
+            if old_zone and old_zone.lower() != map_name.lower():
+                self._zones.link(old_zone, map_name)
+            for zone in self._zones.neighbors(map_name):
+                self._loader.prefetch(zone)
             config.data['maps']['last_zone'] = self._data.zone
             config.save()
             if keep_loc and old_player_data:
@@ -87,21 +154,101 @@ class MapCanvas(QGraphicsView):
         self._scene.addItem(self._data.grid)
 
     def update_(self, ratio=None):
+        """
+        Brings the map up to date with the scale, z level and settings.  Each
+        part of the map is only redone when something it depends on changed
+        since it was last brought up to date, see _changed.
+        """
         if not ratio:
             ratio = self._scale
 
-        current_alpha = config.data['maps']['current_z_alpha'] / 100
-        other_alpha = config.data['maps']['other_z_alpha'] / 100
-        closest_alpha = config.data['maps']['closest_z_alpha'] / 100
+        maps = config.data['maps']
+        alphas = (maps['current_z_alpha'] / 100,
+                  maps['closest_z_alpha'] / 100,
+                  maps['other_z_alpha'] / 100)
+        use_z_layers = maps['use_z_layers']
 
         # scene
-        self.setTransform(QTransform())  # reset transform object
         self._scale = to_range(ratio, 0.0006, 5.0)
-        config.data['maps']['scale'] = self._scale
-        self.scale(self._scale, self._scale)
+        maps['scale'] = self._scale
+        if self._changed('scale', self._scale):
+            self.setTransform(QTransform())  # reset transform object
+            self.scale(self._scale, self._scale)
 
-        # lines and points of interest
         current_z_level = self._data.geometry.z_groups[self._z_index]
+        view = (self._scale, current_z_level, use_z_layers, alphas)
+
+        # lines
+        if self._changed('lines', view, maps['line_width']):
+            self._update_lines()
+
+        # points of interest
+        if self._changed('poi', view, maps['show_poi']):
+            for z in self._data.keys():
+                for p in self._data[z]['poi']:
+                    self._update_poi(p, z)
+
+        # players
+        if self._changed('players', view):
+            for player in self._data.players.values():
+                self._update_player(player)
+
+        # waypoint
+        player = self._data.players.get('__you__', None)
+        if self._changed('way_point', view, self._data.way_point, player and player.z_level):
+            self._update_way_point()
+
+        # user waypoints
+        if self._changed('waypoints', view):
+            for waypoint in self._data.waypoints.values():
+                self._update_waypoint(waypoint)
+
+        # spawns
+        if self._changed('spawns', view):
+            for spawn in self._data.spawns:
+                self._update_spawn(spawn)
+
+        # grid lines
+        if self._changed('grid', self._scale, maps['show_grid'], maps['grid_line_width']):
+            if maps['show_grid']:
+                pen = self._data.grid.pen()
+                pen.setWidth(int(max(
+                    maps['grid_line_width'],
+                    self.to_scale(maps['grid_line_width'])
+                )))
+                self._data.grid.setPen(pen)
+                self._data.grid.setVisible(True)
+            else:
+                self._data.grid.setVisible(False)
+
+    def _changed(self, part, *inputs):
+        """Returns whether the inputs of part changed since it was last updated."""
+        if self._updated.get(part) == inputs:
+            return False
+        self._updated[part] = inputs
+        return True
+
+    def _invalidate(self, *parts):
+        """Has update_ redo parts, ie. after adding items to them."""
+        for part in parts:
+            self._updated.pop(part, None)
+
+    def _current_z_level(self):
+        return self._data.geometry.z_groups[self._z_index]
+
+    def _opacity(self, z_level):
+        """Returns the opacity of items at z_level."""
+        if not config.data['maps']['use_z_layers'] or z_level == self._current_z_level():
+            return config.data['maps']['current_z_alpha'] / 100
+        return config.data['maps']['other_z_alpha'] / 100
+
+    def _update_lines(self):
+        current_alpha = config.data['maps']['current_z_alpha'] / 100
+        other_alpha = config.data['maps']['other_z_alpha'] / 100
+        closest_alpha = config.data['maps']['closest_z_alpha'] / 100
+        line_width = config.data['maps']['line_width']
+
+        current_z_level = self._current_z_level()
         closest_z_levels = set()
         for x in [i for i in [self._z_index - 1, self._z_index + 1] if i > -1]:
             try:
@@ -118,103 +265,52 @@ class MapCanvas(QGraphicsView):
                     alpha = closest_alpha
                 else:
                     alpha = other_alpha
-            # lines
             bolded = 0.5 if config.data['maps']['use_z_layers'] else 0.0
+            if z == current_z_level or not config.data['maps']['use_z_layers']:
+                width = int(max(line_width + bolded, (line_width + bolded) / self._scale))
+            else:
+                width = int(max(line_width - 0.8, (line_width - 0.8) / self._scale))
             for path in self._data[z]['paths'].childItems():
-                if z == current_z_level or not config.data['maps']['use_z_layers']:
-                    pen = path.pen()
-                    pen.setWidth(int(max(
-                        config.data['maps']['line_width'] + bolded,
-                        (config.data['maps']['line_width'] +
-                         bolded) / self._scale
-                    )))
-                    path.setPen(pen)
-                else:
-                    pen = path.pen()
-                    pen.setWidth(int(max(
-                        config.data['maps']['line_width'] - 0.8,
-                        (config.data['maps']['line_width'] - 0.8) / self._scale
-                    )))
+                pen = path.pen()
+                if pen.width() != width:
+                    pen.setWidth(width)
                     path.setPen(pen)
 
             self._data[z]['paths'].setOpacity(alpha)
 
-            # points of interest
-            for p in self._data[z]['poi']:
-                p.update_(min(5, self.to_scale()))
-                if not config.data['maps']['show_poi']:
-                    p.text.setOpacity(0)
-                elif config.data['maps']['use_z_layers']:
-                    if z == current_z_level:
-                        p.text.setOpacity(current_alpha)
-                    else:
-                        p.text.setOpacity(other_alpha)
-                else:
-                    p.text.setOpacity(current_alpha)
-
-        # players
-        for player in self._data.players.values():
-            player.update_(self.to_scale())
-            if config.data['maps']['use_z_layers']:
-                if player.z_level == current_z_level:
-                    player.setOpacity(current_alpha)
-                else:
-                    player.setOpacity(other_alpha)
-            else:
-                player.setOpacity(current_alpha)
-
-        # waypoint
-        if self._data.way_point:
-            self._data.way_point.update_(self.to_scale())
-            if config.data['maps']['use_z_layers']:
-                self._data.way_point.pixmap.setOpacity(
-                    current_alpha if (self._data.way_point.location.z ==
-                                      current_z_level) else other_alpha
-                )
-                player = self._data.players.get('__you__', None)
-                if player and current_z_level in \
-                        [self._data.way_point.location.z, player.z_level]:
-                    self._data.way_point.line.setOpacity(current_alpha)
-                else:
-                    self._data.way_point.line.setOpacity(other_alpha)
+    def _update_poi(self, p, z):
+        p.update_(min(5, self.to_scale()))
+        if not config.data['maps']['show_poi']:
+            p.text.setOpacity(0)
+        else:
+            p.text.setOpacity(self._opacity(z))
 
-            else:
-                self._data.way_point.pixmap.setOpacity(current_alpha)
+    def _update_player(self, player):
+        player.update_(self.to_scale())
+        player.setOpacity(self._opacity(player.z_level))
 
-        # user waypoints
-        for waypoint in self._data.waypoints.values():
-            waypoint.update_(self.to_scale())
-            if config.data['maps']['use_z_layers']:
-                if waypoint.z_level == current_z_level:
-                    waypoint.setOpacity(current_alpha)
-                else:
-                    waypoint.setOpacity(other_alpha)
+    def _update_way_point(self):
+        way_point = self._data.way_point
+        if not way_point:
+            return
+        way_point.update_(self.to_scale())
+        way_point.pixmap.setOpacity(self._opacity(way_point.location.z))
+        if config.data['maps']['use_z_layers']:
+            current_z_level = self._current_z_level()
+            player = self._data.players.get('__you__', None)
+            if player and current_z_level in [way_point.location.z, player.z_level]:
+                way_point.line.setOpacity(config.data['maps']['current_z_alpha'] / 100)
             else:
-                waypoint.setOpacity(current_alpha)
+                way_point.line.setOpacity(config.data['maps']['other_z_alpha'] / 100)
 
-        # spawns
-        for spawn in self._data.spawns:
-            spawn.setScale(self.to_scale())
-            spawn.realign(self.to_scale())
-            if config.data['maps']['use_z_layers']:
-                spawn.setOpacity(
-                    current_alpha if (spawn.location.z ==
-                                      current_z_level) else other_alpha
-                )
-            else:
-                spawn.setOpacity(current_alpha)
+    def _update_waypoint(self, waypoint):
+        waypoint.update_(self.to_scale())
+        waypoint.setOpacity(self._opacity(waypoint.z_level))
 
-        # grid lines
-        if config.data['maps']['show_grid']:
-            pen = self._data.grid.pen()
-            pen.setWidth(int(max(
-                config.data['maps']['grid_line_width'],
-                self.to_scale(config.data['maps']['grid_line_width'])
-            )))
-            self._data.grid.setPen(pen)
-            self._data.grid.setVisible(True)
-        else:
-            self._data.grid.setVisible(False)
+    def _update_spawn(self, spawn):
+        spawn.setScale(self.to_scale())
+        spawn.realign(self.to_scale())
+        spawn.setOpacity(self._opacity(spawn.location.z))
 
     def to_scale(self, float_value=1.0):
         return float_value / self._scale
@@ -235,6 +331,9 @@ class MapCanvas(QGraphicsView):
             self._scene.removeItem(player)
 
     def add_player(self, name, timestamp, location):
+        if self._loading_zone is not None:
+            self._pending.append((self.add_player, (name, timestamp, location)))
+            return
         if name not in self._data.players:
             self._data.players[name] = Player(
                 name=name,
@@ -250,12 +349,11 @@ class MapCanvas(QGraphicsView):
         )
 
         if name == '__you__' and config.data['maps']['use_z_layers']:
-            self._z_index = self._data.geometry.z_groups.index(
-                self._data.get_closest_z_group(
-                    self._data.players['__you__'].location.z
-                ))
+            self._z_index = self._data.get_z_group_index(
+                self._data.players['__you__'].location.z)
 
-        self.update_()
+        self.update_()  # only redoes the map if the z level changed
+        self._update_player(self._data.players[name])
 
         if self._data.way_point and name == '__you__':
             self._data.way_point.update_(
@@ -272,6 +370,9 @@ class MapCanvas(QGraphicsView):
             self._scene.removeItem(waypoint)
 
     def add_waypoint(self, name, location, icon):
+        if self._loading_zone is not None:
+            self._pending.append((self.add_waypoint, (name, location, icon)))
+            return
         if name not in self._data.waypoints:
             self._data.waypoints[name] = UserWaypoint(
                 name=name.rsplit(":", 1)[0],
@@ -285,6 +386,7 @@ class MapCanvas(QGraphicsView):
         )
 
         self.update_()
+        self._update_waypoint(self._data.waypoints[name])
 
     def enterEvent(self, event):
         if config.data['maps']['show_mouse_location']:
@@ -395,6 +497,7 @@ class MapCanvas(QGraphicsView):
 
                 self._scene.addItem(spawn)
                 self._data.spawns.append(spawn)
+                self._invalidate('spawns')
                 spawn.start()
             dialog.deleteLater()
 
@@ -564,6 +667,9 @@ class MapCanvas(QGraphicsView):
     def record_path_loc(self, loc):
         if not self._path_recording:
             return
+        if self._loading_zone is not None:
+            self._pending.append((self.record_path_loc, (loc,)))
+            return
 
         print("Recording loc: %s" % str(loc))
         if self._path_last_loc is None:
@@ -586,16 +692,20 @@ class MapCanvas(QGraphicsView):
                 print("Failed to write loc to pathfile: %s" % e)
 
             # Also add line to the active map
+            self._zones.remove(self._data.zone)  # cached without it
             z_group = self._data.get_closest_z_group(loc[2])
-            color = MapData.color_transform(QColor(255, 0, 0))
-            map_line = QGraphicsPathItem()
-            map_line.setPen(
-                QPen(color, config.data['maps']['line_width']))
+            map_line = self._data.recorded_paths.get(z_group)
+            if map_line is None:
+                color = MapData.color_transform(QColor(255, 0, 0))
+                map_line = QGraphicsPathItem()
+                map_line.setPen(
+                    QPen(color, config.data['maps']['line_width']))
+                self._data[z_group]['paths'].addToGroup(map_line)
+                self._data.recorded_paths[z_group] = map_line
+                self._invalidate('lines')
             map_path = map_line.path()
-            map_path.moveTo(self._path_last_loc[0], self._path_last_loc[1])
-            map_path.lineTo(loc[0], loc[1])
+            add_lines(map_path, (self._path_last_loc[0], self._path_last_loc[1], loc[0], loc[1]))
             map_line.setPath(map_path)
-            self._data[z_group]['paths'].addToGroup(map_line)
             self.update_()
 
         # Update past loc to current loc
@@ -616,12 +726,14 @@ class MapCanvas(QGraphicsView):
             print("Failed to write point to pathfile: %s" % e)
 
         # Also add point to the active map
+        self._zones.remove(self._data.zone)  # cached without it
         z_group = self._data.get_closest_z_group(loc[2])
         color = MapData.color_transform(QColor(255, 0, 0))
         map_poi = MapPoint(
             x=loc[0], y=loc[1], z=loc[2],
             color=color, size=3, text=desc)
-        self._data[z_group]['poi'].append(
-            PointOfInterest(location=map_poi))
-        self._draw()
+        poi = PointOfInterest(location=map_poi)
+        self._data[z_group]['poi'].append(poi)
+        self._scene.addItem(poi.text)
         self.update_()
+        self._update_poi(poi, z_group)
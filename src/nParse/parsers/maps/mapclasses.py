@@ -1,12 +1,12 @@
 import datetime
 
 import colorhash
-from PySide6.QtCore import Qt, QTimer, QPointF
+from PySide6.QtCore import Qt, QPointF
 from PySide6.QtGui import QPixmap, QPen
 from PySide6.QtWidgets import (QGraphicsItemGroup, QGraphicsLineItem,
                              QGraphicsPixmapItem, QGraphicsTextItem)
 
-from nParse.helpers import format_time, get_degrees_from_line, to_eq_xy
+from nParse.helpers import clock, format_time, get_degrees_from_line, scheduler, to_eq_xy
 
 
 class MouseLocation(QGraphicsTextItem):
@@ -95,6 +95,13 @@ class Player(QGraphicsItemGroup):
         self.addToGroup(self.nametag)
         self.z_level = 0
         self.color = colorhash.ColorHash(self.name)
+        self.nametag.setHtml(
+            "<font color='{}' size='{}'>{}</font>".format(
+                self.color.hex if self.name != "__you__" else "purple",
+                5,
+                self.name if self.name != "__you__" else "You"
+            )
+        )
 
     def update_(self, scale):
         if self.previous_location:
@@ -108,13 +115,6 @@ class Player(QGraphicsItemGroup):
             self.setPos(self.location.x, self.location.y)
             self.directional.setVisible(True)
         self.setPos(self.location.x, self.location.y)
-        self.nametag.setHtml(
-            "<font color='{}' size='{}'>{}</font>".format(
-                self.color.hex if self.name != "__you__" else "purple",
-                5,
-                self.name if self.name != "__you__" else "You"
-            )
-        )
 
 
 class SpawnPoint(QGraphicsItemGroup):
@@ -139,28 +139,26 @@ class SpawnPoint(QGraphicsItemGroup):
         self.pixmap = pixmap
         self.text = text
 
-        self.timer = QTimer()
+        self._time_text = None  # last shown in text
 
     def _update(self):
-        if self.timer:
-            remaining = self._end_time - datetime.datetime.now()
-            remaining_seconds = remaining.total_seconds()
-            if remaining_seconds < 0:
-                self.stop()
-            elif remaining_seconds <= 30:
-                self.text.setHtml(
-                    "<font color='red' size='5'>{}</font>".format(
-                        format_time(remaining))
-                )
-            else:
-                self.text.setHtml(
-                    "<font color='white'>{}</font>".format(
-                        format_time(remaining))
-                )
+        """Ticked by the scheduler, returns False once the spawn is up."""
+        remaining = self._end_time - clock.now()
+        remaining_seconds = remaining.total_seconds()
+        if remaining_seconds < 0:
+            self.stop()
+            return False
+        elif remaining_seconds <= 30:
+            time_text = "<font color='red' size='5'>{}</font>".format(
+                format_time(remaining))
+        else:
+            time_text = "<font color='white'>{}</font>".format(
+                format_time(remaining))
+        if time_text != self._time_text:
+            self._time_text = time_text
+            self.text.setHtml(time_text)
             self.realign()
-
-            if remaining_seconds > 0 and self.timer:
-                self.timer.singleShot(1000, self._update)
+        return True
 
     def realign(self, scale=None):
         if scale:
@@ -170,12 +168,13 @@ class SpawnPoint(QGraphicsItemGroup):
                          2 + self.pixmap.boundingRect().width() / 2, 15)
 
     def start(self, _=None, timestamp=None):
-        timestamp = timestamp if timestamp else datetime.datetime.now()
+        timestamp = timestamp if timestamp else clock.now()
         self._end_time = timestamp + datetime.timedelta(seconds=self.length)
-        if self.timer:
-            self._update()
+        if self._update():
+            scheduler.add(self._update)
 
     def stop(self):
+        self._time_text = None
         self.text.setHtml(
             "<font color='green' align='center'>{}</font>".format(self.name.upper()))
 
@@ -1,12 +1,18 @@
+import bisect
 import csv
 import math
+import os
 import pathlib
+import threading
+import time
+from array import array
 from collections import Counter
 
 from PySide6.QtGui import QColor, QPen, QPainterPath
 from PySide6.QtWidgets import QGraphicsPathItem, QGraphicsItemGroup
 
 from nParse.helpers import config
+from nParse.parsers.maps.mapcache import load_zone_map
 from nParse.parsers.maps.mapclasses import MapPoint, MapGeometry, MapLine, PointOfInterest
 
 MAP_KEY_FILE = 'data/maps/map_keys.ini'
@@ -15,93 +21,269 @@ MAP_SPAWNTIMES_FILE = 'data/maps/map_timers.csv'
 MAP_FILES_LOCATION = 'data/maps/map_files'
 MAP_FILES_PATHLIB = pathlib.Path(MAP_FILES_LOCATION)
 ICON_MAP = {'corpse': 'data/maps/spawn.png'}
+CATALOG_CHECK_INTERVAL = 5  # seconds between checks for changed zone files
+
+
+def _read_pairs(file_name):
+    # Load Map Pairs from an ini file
+    pairs = {}
+    with open(file_name, 'r') as file:
+        for line in file.readlines():
+            values = line.split('=')
+            pairs[values[0].strip()] = values[1].strip()
+    return pairs
+
+
+def _read_spawn_timers(file_name):
+    # Load Spawn Timer Pairs from map_timers.csv
+    with open(file_name, 'r') as file:
+        reader = csv.reader(file)
+        return dict(reader)
+
+
+class ZoneCatalog:
+    """
+    The zone names of map_keys.ini, /who zone names of map_keys_who.ini and
+    spawn timers of map_timers.csv, read on first use and again after they
+    change.  Files are checked for changes at most every
+    CATALOG_CHECK_INTERVAL seconds, so lookups do not touch the disk.
+    """
+
+    def __init__(self):
+        self._files = {}  # file name: ((mtime_ns, size), checked, values)
+        self._lock = threading.Lock()  # the map loader reads it too
+
+    def _get(self, file_name, read):
+        now = time.monotonic()
+        entry = self._files.get(file_name)
+        if entry is not None and now - entry[1] < CATALOG_CHECK_INTERVAL:
+            return entry[2]
+        with self._lock:
+            try:
+                stat = os.stat(file_name)
+                source = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                source = None
+            entry = self._files.get(file_name)
+            if entry is None or entry[0] != source:
+                values = read(file_name)
+            else:
+                values = entry[2]
+            self._files[file_name] = (source, now, values)
+        return values
+
+    @property
+    def zones(self):
+        """Returns {zone name: map file name}."""
+        return self._get(MAP_KEY_FILE, _read_pairs)
+
+    def who_zone(self, zone_name):
+        """Returns the zone name of the /who zone_name."""
+        return self._get(MAP_KEY_FILE_WHO, _read_pairs).get(zone_name, zone_name)
+
+    def spawn_timer(self, zone, default='6:40'):
+        """Returns the default respawn time of zone."""
+        short_zone = self.zones.get(zone.strip().lower())
+        return self._get(MAP_SPAWNTIMES_FILE, _read_spawn_timers).get(short_zone, default)
+
+
+_catalog = ZoneCatalog()
+
+
+class ZoneLayout:
+    """
+    Everything MapData needs to show a zone, as plain data that can be built
+    off the GUI thread.
+
+    lines holds {z group: {(r, g, b): array of x1, y1, x2, y2 of each line}},
+    poi {z group: [(x, y, z, (r, g, b), size, text)]} and grid the x1, y1,
+    x2, y2 of each grid line.
+    """
+
+    __slots__ = ('zone', 'geometry', 'lines', 'poi', 'grid')
+
+    def __init__(self, zone):
+        self.zone = zone
+        self.geometry = {}  # MapGeometry keywords
+        self.lines = {}
+        self.poi = {}
+        self.grid = []
+
+    def estimate_size(self):
+        """Returns a rough estimate of the memory used, in bytes."""
+        size = 1024 + 100 * len(self.grid)
+        for buckets in self.lines.values():
+            for coordinates in buckets.values():
+                size += 250 + coordinates.itemsize * len(coordinates)
+        for points in self.poi.values():
+            size += 300 * len(points)
+        return size
+
+
+def load_zone_layout(zone):
+    """Returns the ZoneLayout of zone, does not touch any Qt objects."""
+    layout = ZoneLayout(zone)
+
+    # Get the lines and points of all map files for current zone
+    map_file_name = MapData.get_zone_dict()[zone.strip().lower()]
+    zone_map = load_zone_map(MAP_FILES_LOCATION, map_file_name)
+    lines = zone_map.lines
+
+    all_x = lines[0::6] + lines[3::6]
+    all_y = lines[1::6] + lines[4::6]
+    all_z = array('d', map(min, lines[2::6], lines[5::6]))
+
+    # Create Grid Lines
+    lowest_x, highest_x, lowest_y, highest_y, lowest_z, highest_z = min(all_x), max(all_x), min(all_y), max(
+        all_y), min(all_z), max(all_z)
+
+    left, right = int(math.floor(lowest_x / 1000) *
+                      1000), int(math.ceil(highest_x / 1000) * 1000)
+    top, bottom = int(math.floor(lowest_y / 1000) *
+                      1000), int(math.ceil(highest_y / 1000) * 1000)
+
+    for number in range(left, right + 1000, 1000):
+        layout.grid.append((number, top, number, bottom))
+
+    for number in range(top, bottom + 1000, 1000):
+        layout.grid.append((left, number, right, number))
+
+    z_groups = cluster_z_groups(all_z)
+
+    # Bucket lines by z group and color, each bucket becomes one path
+    values = iter(lines)
+    colors = iter(zone_map.line_colors)
+    for (x1, y1, _, x2, y2, _), lz, lc in zip(zip(*[values] * 6), all_z, zip(colors, colors, colors)):
+        lz = z_groups[max(bisect.bisect_right(z_groups, lz) - 1, 0)]
+        layout.lines.setdefault(lz, {}).setdefault(lc, array('d')).extend((x1, y1, x2, y2))
+
+    # Points of Interest
+    for z in layout.lines:
+        layout.poi[z] = []
+    poi_colors = zone_map.poi_colors
+    for index, text in enumerate(zone_map.poi_texts):
+        x, y, z = zone_map.poi[index * 3:index * 3 + 3]
+        layout.poi[closest_z_group(z_groups, z)].append((
+            x, y, z, tuple(poi_colors[index * 3:index * 3 + 3]), zone_map.poi_sizes[index], text))
+
+    layout.geometry = dict(
+        lowest_x=lowest_x,
+        highest_x=highest_x,
+        lowest_y=lowest_y,
+        highest_y=highest_y,
+        lowest_z=lowest_z,
+        highest_z=highest_z,
+        center_x=int(highest_x - (highest_x - lowest_x) / 2),
+        center_y=int(highest_y - (highest_y - lowest_y) / 2),
+        width=int(highest_x - lowest_x),
+        height=int(highest_y - lowest_y),
+        z_groups=z_groups
+    )
+
+    return layout
+
+
+def add_lines(path, coordinates):
+    """
+    Appends lines to the QPainterPath path from coordinates holding x1, y1,
+    x2, y2 of each.  A line starting where the previous one ended continues
+    it instead of starting a new subpath.
+    """
+    path.reserve(path.elementCount() + len(coordinates) // 2)
+    if path.elementCount():
+        last = path.currentPosition()
+        last_x, last_y = last.x(), last.y()
+    else:
+        last_x = last_y = None
+    values = iter(coordinates)
+    for x1, y1, x2, y2 in zip(values, values, values, values):
+        if x1 != last_x or y1 != last_y:
+            path.moveTo(x1, y1)
+        path.lineTo(x2, y2)
+        last_x, last_y = x2, y2
+
+
+def cluster_z_groups(all_z):
+    """
+    Returns the sorted z levels the lines at heights all_z bunch together
+    around, from the histogram of all_z.
+    """
+    counter = Counter(all_z)
+
+    # bunch together zgroups based on peaks with floor being low point before rise
+    z_groups = []
+    last_value = None
+    first_run = True
+    for z in sorted(counter.items()):
+        if last_value is None:
+            last_value = z
+            continue
+        if (abs(last_value[0] - z[0]) < 20) or z[1] < 8:
+            last_value = (last_value[0], last_value[1] + z[1])
+        else:
+            if first_run:
+                first_run = False
+                if last_value[1] < 40 or abs(last_value[0] - z[0]) < 18:
+                    last_value = z
+                    continue
+            z_groups.append(last_value[0])
+            last_value = z
+
+    # get last iteration
+    if last_value[1] > 50:
+        z_groups.append(last_value[0])
+
+    return z_groups
+
+
+def z_group_index(z_groups, z):
+    """
+    Returns the index in the sorted z_groups of the group z belongs to, the
+    highest at or below z, or the lowest when z is below them all.
+    """
+    return max(bisect.bisect_right(z_groups, z) - 1, 0)
+
+
+def closest_z_group(z_groups, z):
+    return z_groups[z_group_index(z_groups, z)]
 
 
 class MapData(dict):
 
-    def __init__(self, zone=None):
+    def __init__(self, zone=None, layout=None):
+        """Shows zone, or the ZoneLayout already loaded for it."""
         super().__init__()
         self.zone = zone
-        self.raw = {'lines': [], 'poi': [], 'grid': []}
+        self.raw = {'poi': [], 'grid': []}
         self.geometry = None  # MapGeometry
         self.players = {}
         self.spawns = []
         self.waypoints = {}
         self.way_point = None
         self.grid = None
+        self.recorded_paths = {}  # z group: QGraphicsPathItem of the path being recorded
 
-        if self.zone is not None:
-            self._load()
-
-    def _load(self):
-        # Get list of all map files for current zone
-        map_file_name = MapData.get_zone_dict()[self.zone.strip().lower()]
-        maps = MAP_FILES_PATHLIB.glob(
-            '**/{zone}*.txt'.format(zone=map_file_name))
-
-        all_x, all_y, all_z = [], [], []
-
-        # TODO: Remove the references to raw
-        # Create Lines and Points
-        for map_file in maps:
-            print("Loading: %s" % map_file)
-            with open(map_file, 'r') as f:
-                for line in f.readlines():
-                    line_type = line.lower()[0:1]
-                    data = [value.strip() for value in line[1:].split(',')]
-                    if line_type == 'l':  # line
-                        x1, y1, z1, x2, y2, z2 = list(map(float, data[0:6]))
-                        self.raw['lines'].append(MapLine(
-                            x1=x1,
-                            y1=y1,
-                            z1=z1,
-                            x2=x2,
-                            y2=y2,
-                            z2=z2,
-                            color=self.color_transform(QColor(
-                                int(data[6]),
-                                int(data[7]),
-                                int(data[8])
-                            ))
-                        ))
-                        all_x.extend((x1, x2))
-                        all_y.extend((y1, y2))
-                        all_z.append(min(z1, z2))
-                        # if abs(z1 - z2) < 2:
-                        # if z1 == z2:
-                        # all_z.extend((z1, z2))
-
-                    elif line_type == 'p':  # point
-                        x, y, z = map(float, data[0:3])
-                        self.raw['poi'].append(MapPoint(
-                            x=x,
-                            y=y,
-                            z=z,
-                            size=int(data[6]),
-                            text=str(data[7]),
-                            color=self.color_transform(QColor(
-                                int(data[3]),
-                                int(data[4]),
-                                int(data[5])
-                            ))
-                        ))
+        if layout is None and self.zone is not None:
+            layout = load_zone_layout(self.zone)
+        if layout is not None:
+            if self.zone is None:
+                self.zone = layout.zone
+            self._build(layout)
 
-        # Create Grid Lines
-        lowest_x, highest_x, lowest_y, highest_y, lowest_z, highest_z = min(all_x), max(all_x), min(all_y), max(
-            all_y), min(all_z), max(all_z)
-
-        left, right = int(math.floor(lowest_x / 1000) *
-                          1000), int(math.ceil(highest_x / 1000) * 1000)
-        top, bottom = int(math.floor(lowest_y / 1000) *
-                          1000), int(math.ceil(highest_y / 1000) * 1000)
+    def _build(self, layout):
+        # one QColor per distinct color rather than per line
+        colors = {}
 
-        for number in range(left, right + 1000, 1000):
-            self.raw['grid'].append(MapLine(
-                x1=number, x2=number, y1=top, y2=bottom, z1=0, z2=0, color=QColor(255, 255, 255, 25)))
+        def get_color(rgb):
+            color = colors.get(rgb)
+            if color is None:
+                color = colors[rgb] = self.color_transform(QColor(*rgb))
+            return color
 
-        for number in range(top, bottom + 1000, 1000):
+        # Create Grid Lines
+        for x1, y1, x2, y2 in layout.grid:
             self.raw['grid'].append(MapLine(
-                y1=number, y2=number, x1=left, x2=right, z1=0, z2=0, color=QColor(255, 255, 255, 25)))
+                x1=x1, x2=x2, y1=y1, y2=y2, z1=0, z2=0, color=QColor(255, 255, 255, 25)))
 
         self.grid = QGraphicsPathItem()
         line_path = QPainterPath()
@@ -115,120 +297,50 @@ class MapData(dict):
         ))
         self.grid.setZValue(0)
 
-        # Get z levels
-        counter = Counter(all_z)
-
-        # bunch together zgroups based on peaks with floor being low point before rise
-        z_groups = []
-        last_value = None
-        first_run = True
-        for z in sorted(counter.items(), key=lambda x: x[0]):
-            if last_value is None:
-                last_value = z
-                continue
-            if (abs(last_value[0] - z[0]) < 20) or z[1] < 8:
-                last_value = (last_value[0], last_value[1] + z[1])
-            else:
-                if first_run:
-                    first_run = False
-                    if last_value[1] < 40 or abs(last_value[0] - z[0]) < 18:
-                        last_value = z
-                        continue
-                z_groups.append(last_value[0])
-                last_value = z
-
-        # get last iteration
-        if last_value[1] > 50:
-            z_groups.append(last_value[0])
+        self._z_groups = layout.geometry['z_groups']
 
-        self._z_groups = z_groups
-
-        # Create QGraphicsPathItem for lines seperately to retain colors
-        temp_dict = {}
-        for l in self.raw['lines']:
-            lz = min(l.z1, l.z2)
-            lz = self.get_closest_z_group(lz)
-            if not temp_dict.get(lz, None):
-                temp_dict[lz] = {'paths': {}}
-            lc = l.color.getRgb()
-            if not temp_dict[lz]['paths'].get(lc, None):
-                path_item = QGraphicsPathItem()
-                path_item.setPen(
-                    QPen(l.color, config.data['maps']['line_width']))
-                temp_dict[lz]['paths'][lc] = path_item
-            path = temp_dict[lz]['paths'][lc].path()
-            path.moveTo(l.x1, l.y1)
-            path.lineTo(l.x2, l.y2)
-            temp_dict[lz]['paths'][lc].setPath(path)
-
-        # Group QGraphicsPathItems into QGraphicsItemGroups and update self
-        for z in temp_dict:
+        # Create a QGraphicsPathItem per color to retain colors, grouped
+        # into a QGraphicsItemGroup per z group
+        for z, buckets in layout.lines.items():
             item_group = QGraphicsItemGroup()
-            for (_, path) in temp_dict[z]['paths'].items():
-                item_group.addToGroup(path)
+            for lc, coordinates in buckets.items():
+                path = QPainterPath()
+                add_lines(path, coordinates)
+                path_item = QGraphicsPathItem(path)
+                path_item.setPen(
+                    QPen(get_color(lc), config.data['maps']['line_width']))
+                item_group.addToGroup(path_item)
             self[z] = {'paths': None, 'poi': []}
             self[z]['paths'] = item_group
 
         # Create Points of Interest
-        for p in self.raw['poi']:
-            z = self.get_closest_z_group(p.z)
-            self[z]['poi'].append(
-                PointOfInterest(location=p)
-            )
-
-        self.geometry = MapGeometry(
-            lowest_x=lowest_x,
-            highest_x=highest_x,
-            lowest_y=lowest_y,
-            highest_y=highest_y,
-            lowest_z=lowest_z,
-            highest_z=highest_z,
-            center_x=int(highest_x - (highest_x - lowest_x) / 2),
-            center_y=int(highest_y - (highest_y - lowest_y) / 2),
-            width=int(highest_x - lowest_x),
-            height=int(highest_y - lowest_y),
-            z_groups=z_groups
-        )
-
-        # Load Spawn Timer Pairs from map_timers.csv
-        with open(MAP_SPAWNTIMES_FILE, 'r') as file:
-            reader = csv.reader(file)
-            self.spawn_timer_dict = dict(reader)
+        for z, points in layout.poi.items():
+            for x, y, pz, rgb, size, text in points:
+                p = MapPoint(x=x, y=y, z=pz, size=size, text=text, color=get_color(rgb))
+                self.raw['poi'].append(p)
+                self[z]['poi'].append(
+                    PointOfInterest(location=p)
+                )
+
+        self.geometry = MapGeometry(**layout.geometry)
 
     def get_closest_z_group(self, z):
-        closest = min(self._z_groups, key=lambda x: abs(x - z))
-        if z < closest:
-            lower_index = self._z_groups.index(closest) - 1
-            if lower_index > -1:
-                closest = self._z_groups[lower_index]
-        return closest
+        return closest_z_group(self._z_groups, z)
+
+    def get_z_group_index(self, z):
+        return z_group_index(self._z_groups, z)
 
     @staticmethod
     def get_zone_dict():
-        # Load Map Pairs from map_keys.ini
-        zone_dict = {}
-        with open(MAP_KEY_FILE, 'r') as file:
-            for line in file.readlines():
-                values = line.split('=')
-                zone_dict[values[0].strip()] = values[1].strip()
-        return zone_dict
+        """Returns {zone name: map file name}, shared so do not modify it."""
+        return _catalog.zones
 
     @staticmethod
     def translate_who_zone(zone_name):
-        # Load Map Pairs from map_keys.ini
-        zone_dict = {}
-        with open(MAP_KEY_FILE_WHO, 'r') as file:
-            for line in file.readlines():
-                values = line.split('=')
-                zone_dict[values[0].strip()] = values[1].strip()
-        return zone_dict.get(zone_name, zone_name)
+        return _catalog.who_zone(zone_name)
 
     def get_default_spawn_timer(self):
-        try:
-            short_zone = MapData.get_zone_dict().get(self.zone.strip().lower())
-        except KeyError:
-            short_zone = None
-        return self.spawn_timer_dict.get(short_zone, '6:40')
+        return _catalog.spawn_timer(self.zone)
 
     @staticmethod
     def color_transform(color):
@@ -0,0 +1,122 @@
+"""Loads zone maps off the GUI thread."""
+import queue
+import traceback
+
+from PySide6.QtCore import QThread, Signal
+
+from nParse.helpers import config
+from nParse.parsers.maps.mapdata import load_zone_layout
+
+ZONE_LINKS = 4  # zones remembered as reached from each zone
+
+
+class MapLoader(QThread):
+    """
+    Builds the ZoneLayout of requested zones in the background and emits
+    loaded(zone, layout) for each, with None as layout when it failed.
+    Requests that queue up while a zone is loading collapse to the latest,
+    prefetched zones are built only while there is nothing requested.
+    """
+
+    loaded = Signal(str, object)
+
+    def __init__(self):
+        super().__init__()
+        self._requests = queue.Queue()  # (zone, prefetch) or None to stop
+
+    def request(self, zone):
+        self._put((zone, False))
+
+    def prefetch(self, zone):
+        self._put((zone, True))
+
+    def _put(self, request):
+        self._requests.put(request)
+        if not self.isRunning():
+            self.start()
+
+    def stop(self):
+        if self.isRunning():
+            self._requests.put(None)
+            self.wait()
+
+    def run(self):
+        prefetches = []
+        while True:
+            requests = [] if prefetches else [self._requests.get()]
+            while True:
+                try:
+                    requests.append(self._requests.get_nowait())
+                except queue.Empty:
+                    break
+            if None in requests:
+                return
+            zones = []
+            for zone, prefetch in requests:
+                if not prefetch:
+                    zones.append(zone)
+                elif zone not in prefetches:
+                    prefetches.append(zone)
+            # only the latest zone requested while loading matters
+            zone = zones[-1] if zones else prefetches[0]
+            if zone in prefetches:
+                prefetches.remove(zone)
+            try:
+                layout = load_zone_layout(zone)
+            except Exception:
+                traceback.print_exc()
+                layout = None
+            self.loaded.emit(zone, layout)
+
+
+class ZoneCache:
+    """
+    The ZoneLayouts of recently shown and prefetched zones, limited to the
+    maps zone_cache_size setting in MiB by dropping the least recently used.
+    """
+
+    def __init__(self):
+        self._layouts = {}  # zone: (ZoneLayout, size), least recently used first
+        self._size = 0
+
+    def __contains__(self, zone):
+        return zone.lower() in self._layouts
+
+    def get(self, zone):
+        entry = self._layouts.pop(zone.lower(), None)
+        if entry is None:
+            return None
+        self._layouts[zone.lower()] = entry
+        return entry[0]
+
+    def add(self, layout):
+        self.remove(layout.zone)
+        budget = config.data['maps']['zone_cache_size'] * 1024 * 1024
+        size = layout.estimate_size()
+        if size > budget:
+            return
+        self._layouts[layout.zone.lower()] = (layout, size)
+        self._size += size
+        while self._size > budget:
+            self.remove(next(iter(self._layouts)))
+
+    def remove(self, zone):
+        entry = self._layouts.pop(zone.lower(), None)
+        if entry is not None:
+            self._size -= entry[1]
+
+    @staticmethod
+    def link(from_zone, to_zone):
+        """Remembers zoning between from_zone and to_zone, both ways."""
+        links = config.data['maps']['zone_links']
+        for zone, next_zone in ((from_zone.lower(), to_zone.lower()),
+                                (to_zone.lower(), from_zone.lower())):
+            next_zones = [next_zone] + [z for z in links.get(zone, []) if z != next_zone]
+            links[zone] = next_zones[:ZONE_LINKS]
+
+    def neighbors(self, zone):
+        """Returns the zones reached from zone before that are not cached."""
+        if not config.data['maps']['zone_cache_size']:
+            return []
+        return [z for z in config.data['maps']['zone_links'].get(zone.lower(), [])
+                if z not in self]
@@ -69,41 +69,64 @@ class Maps(ParserWindow):
         else:
             self._map.load_map('west freeport')
 
-    def parse(self, timestamp, text):
-        if text[:23] == 'LOADING, PLEASE WAIT...':
-            QApplication.instance()._signals["maps"].zoning.emit()
-        elif text[:16] == 'You have entered':
-            QApplication.instance()._signals["maps"].new_zone.emit(text[17:-1])
-            self._map.load_map(text[17:-1])
-        elif ZONE_MATCHER.match(text):
-            new_zone = ZONE_MATCHER.match(text).groupdict()['zone'].lower()
-            new_zone = MapData.translate_who_zone(new_zone)
-            if new_zone not in (self._map._data.zone.lower(), 'everquest'):
-                QApplication.instance()._signals["maps"].new_zone.emit(new_zone)
-                self._map.load_map(new_zone, keep_loc=True)
-        elif text[:16] == 'Your Location is':
-            QApplication.instance()._signals["maps"].location.emit(timestamp.isoformat(), text[17:])
-            x, y, z = [float(value) for value in text[17:].strip().split(',')]
-            x, y = to_real_xy(x, y)
-            self._map.add_player('__you__', timestamp, MapPoint(x=x, y=y, z=z))
-            self._map.record_path_loc((x, y, z))
-        elif text[:16] == "start_recording_":
-            QApplication.instance()._signals["maps"].start_recording.emit(text.split()[0][16:])
-            recording_name = text.split()[0][16:]
-            if recording_name:
-                recording_name = recording_name.replace('_', ' ')
-                self._map.start_path_recording(recording_name)
-        elif text[:17] == "rename_recording_":
-            QApplication.instance()._signals["maps"].rename_recording.emit(text.split()[0][17:])
-            recording_name = text.split()[0][17:]
-            if recording_name:
-                recording_name = recording_name.replace('_', ' ')
-                self._map.rename_path_recording(new_name=recording_name)
-        elif text[:14] == "stop_recording":
-            QApplication.instance()._signals["maps"].stop_recording.emit()
-            self._map.stop_path_recording()
-        elif text[:19] == "You have been slain":
-            QApplication.instance()._signals["maps"].death.emit(timestamp.isoformat(), text)
+    @property
+    def loading(self):
+        return self._map.loading
+
+    def register(self, dispatcher):
+        dispatcher.add_prefix('LOADING, PLEASE WAIT...', self._zoning, self.parsing)
+        dispatcher.add_prefix('You have entered', self._entered_zone, self.parsing)
+        dispatcher.add_regex(ZONE_MATCHER, self._who_zone, 'There ', self.parsing)
+        dispatcher.add_prefix('Your Location is', self._location, self.parsing)
+        dispatcher.add_prefix('start_recording_', self._start_recording, self.parsing)
+        dispatcher.add_prefix('rename_recording_', self._rename_recording, self.parsing)
+        dispatcher.add_prefix('stop_recording', self._stop_recording, self.parsing)
+        dispatcher.add_prefix('You have been slain', self._slain, self.parsing)
+
+    def parsing(self):
+        return True  # always parse maps
+
+    def _zoning(self, timestamp, text):
+        QApplication.instance()._signals["maps"].zoning.emit()
+
+    def _entered_zone(self, timestamp, text):
+        QApplication.instance()._signals["maps"].new_zone.emit(text[17:-1])
+        self._map.load_map(text[17:-1])
+
+    def _who_zone(self, timestamp, text, match):
+        new_zone = match.groupdict()['zone'].lower()
+        new_zone = MapData.translate_who_zone(new_zone)
+        if new_zone not in (self._map.zone.lower(), 'everquest'):
+            QApplication.instance()._signals["maps"].new_zone.emit(new_zone)
+            self._map.load_map(new_zone, keep_loc=True)
+
+    def _location(self, timestamp, text):
+        QApplication.instance()._signals["maps"].location.emit(timestamp.isoformat(), text[17:])
+        x, y, z = [float(value) for value in text[17:].strip().split(',')]
+        x, y = to_real_xy(x, y)
+        self._map.add_player('__you__', timestamp, MapPoint(x=x, y=y, z=z))
+        self._map.record_path_loc((x, y, z))
+
+    def _start_recording(self, timestamp, text):
+        QApplication.instance()._signals["maps"].start_recording.emit(text.split()[0][16:])
+        recording_name = text.split()[0][16:]
+        if recording_name:
+            recording_name = recording_name.replace('_', ' ')
+            self._map.start_path_recording(recording_name)
+
+    def _rename_recording(self, timestamp, text):
+        QApplication.instance()._signals["maps"].rename_recording.emit(text.split()[0][17:])
+        recording_name = text.split()[0][17:]
+        if recording_name:
+            recording_name = recording_name.replace('_', ' ')
+            self._map.rename_path_recording(new_name=recording_name)
+
+    def _stop_recording(self, timestamp, text):
+        QApplication.instance()._signals["maps"].stop_recording.emit()
+        self._map.stop_path_recording()
+
+    def _slain(self, timestamp, text):
+        QApplication.instance()._signals["maps"].death.emit(timestamp.isoformat(), text)
 
     # events
     def _toggle_show_poi(self, _):
@@ -0,0 +1 @@
+from nParse.parsers.spells.window import Spells, CustomTrigger
@@ -0,0 +1,39 @@
+"""Custom timers matched against log lines."""
+import re
+
+REGEX_SPECIAL = frozenset('.^$*+?{}[]\\|()')
+
+
+class CustomTimerIndex:
+    """
+    The CustomTriggers of the custom timers, whose text matches whole lines
+    case insensitively with * matching anything.  Timers starting with a
+    literal word are indexed by it, so a line is only tested against the
+    timers it could match.
+    """
+
+    def __init__(self, custom_triggers=()):
+        self._by_word = {}  # first word: [(order, regex, CustomTrigger)]
+        self._any = []  # [(order, regex, CustomTrigger)] not starting with a word
+        timers = {}  # regex: CustomTrigger, one per text
+        for ct in custom_triggers:
+            rx = re.compile(
+                "^{}$".format(ct.text.replace('*', '.*')),
+                re.RegexFlag.IGNORECASE
+                )
+            timers[rx] = ct
+        for order, (rx, ct) in enumerate(timers.items()):
+            word = ct.text.split(' ', 1)[0]
+            if word and not REGEX_SPECIAL.intersection(word):
+                self._by_word.setdefault(word.lower(), []).append((order, rx, ct))
+            else:
+                self._any.append((order, rx, ct))
+
+    def match(self, text):
+        """Returns the CustomTriggers matching text, in configured order."""
+        space = text.find(' ')
+        word = (text[:space] if space > 0 else text).lower()
+        candidates = self._by_word.get(word)
+        if candidates and self._any:
+            candidates = sorted(candidates + self._any)
+        return [ct for _, rx, ct in candidates or self._any if rx.match(text)]
@@ -0,0 +1,96 @@
+"""
+Spell icons cut from the data/spells/spells0#.png sheets.
+
+The sheets are sliced and scaled once into an atlas of 15x15 icons, which is
+kept in memory and saved to ICON_CACHE_FILE, so creating a timer does no file
+I/O or scaling.
+"""
+import os
+
+from PySide6.QtCore import QRect, Qt
+from PySide6.QtGui import QPainter, QPixmap
+from PySide6.QtWidgets import QLabel
+
+ICON_SHEET_FILE = 'data/spells/spells0{}.png'
+ICON_CACHE_FILE = 'data/spells/spell_icons.cache.png'
+ICON_SHEETS = 7
+ICONS_PER_SHEET = 36  # 6x6 icons of 40x40 pixels
+ICON_SIZE = 15
+
+_atlas = None  # QPixmap, a row of ICONS_PER_SHEET icons per sheet
+_icons = {}  # icon_index: QPixmap
+
+
+def _sheet_files():
+    return [ICON_SHEET_FILE.format(number) for number in range(1, ICON_SHEETS + 1)]
+
+
+def _build_atlas():
+    atlas = QPixmap(ICONS_PER_SHEET * ICON_SIZE, ICON_SHEETS * ICON_SIZE)
+    atlas.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(atlas)
+    for row, file_name in enumerate(_sheet_files()):
+        sheet = QPixmap(file_name)
+        if sheet.isNull():
+            continue
+        for spell_number in range(ICONS_PER_SHEET):
+            x = spell_number % 6 * 40
+            y = spell_number // 6 * 40
+            icon = sheet.copy(QRect(x, y, 40, 40)).scaled(
+                ICON_SIZE, ICON_SIZE, mode=Qt.TransformationMode.SmoothTransformation)
+            painter.drawPixmap(spell_number * ICON_SIZE, row * ICON_SIZE, icon)
+    painter.end()
+    return atlas
+
+
+def _save_atlas():
+    # written aside and swapped in, a crash mid write cannot leave a
+    # truncated image behind
+    temp_file_name = ICON_CACHE_FILE + '.tmp'
+    try:
+        if not _atlas.save(temp_file_name, 'PNG'):
+            raise OSError('could not write {}'.format(temp_file_name))
+        os.replace(temp_file_name, ICON_CACHE_FILE)
+    except OSError:
+        print("Unable to save spell icon cache: {}".format(ICON_CACHE_FILE))
+
+
+def load_atlas():
+    """Returns the icon atlas, from ICON_CACHE_FILE when it is newer than the sheets."""
+    global _atlas
+    if _atlas is None:
+        try:
+            cache_time = os.path.getmtime(ICON_CACHE_FILE)
+            if all(os.path.getmtime(file_name) <= cache_time
+                   for file_name in _sheet_files() if os.path.exists(file_name)):
+                _atlas = QPixmap(ICON_CACHE_FILE)
+        except OSError:
+            pass  # no cache yet
+        if _atlas is None or _atlas.isNull():
+            _atlas = _build_atlas()
+            _save_atlas()
+    return _atlas
+
+
+def get_spell_pixmap(icon_index):
+    """Returns the 15x15 QPixmap of icon_index."""
+    pixmap = _icons.get(icon_index)
+    if pixmap is None:
+        # spells0<ceil(index / 36)>.png, left to right and top to bottom
+        row = -(-icon_index // ICONS_PER_SHEET) - 1
+        if 0 <= row < ICON_SHEETS:
+            pixmap = load_atlas().copy(QRect(
+                icon_index % ICONS_PER_SHEET * ICON_SIZE, row * ICON_SIZE,
+                ICON_SIZE, ICON_SIZE))
+        else:
+            pixmap = QPixmap(ICON_SIZE, ICON_SIZE)
+            pixmap.fill(Qt.GlobalColor.transparent)
+        _icons[icon_index] = pixmap
+    return pixmap
+
+
+def get_spell_icon(icon_index):
+    label = QLabel()
+    label.setPixmap(get_spell_pixmap(icon_index))
+    label.setFixedSize(15, 15)
+    return label
@@ -0,0 +1,34 @@
+"""Limits on the number of targets and memory used by the spells window."""
+from nParse.helpers import config
+
+PROTECTED_TARGETS = ('__you__', '__custom__')
+
+
+def stale_targets(targets, keep, target_kib, spell_kib):
+    """
+    Returns the targets to remove, least recently updated first, to stay within
+    spells.max_targets and spells.memory_budget (MiB, estimated from the cost
+    of a target and of a spell on it in KiB).  targets maps name to target in
+    the order they were last updated.  Yourself, custom timers and the target
+    'keep' are never removed.
+    """
+    max_targets = config.data['spells']['max_targets']
+    budget = config.data['spells']['memory_budget'] * 1024
+    if not max_targets and not budget:
+        return []
+
+    def cost(target):
+        return target_kib + spell_kib * len(target.spell_widgets())
+
+    count = len(targets)
+    used = sum(cost(target) for target in targets.values()) if budget else 0
+    stale = []
+    for name, target in targets.items():
+        if (not max_targets or count <= max_targets) and (not budget or used <= budget):
+            break
+        if name in PROTECTED_TARGETS or name == keep:
+            continue
+        stale.append(target)
+        count -= 1
+        used -= cost(target) if budget else 0
+    return stale
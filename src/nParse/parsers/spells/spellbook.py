@@ -0,0 +1,268 @@
+"""Spell data loaded from spells_us.txt."""
+import math
+import os
+import pickle
+
+from nParse.helpers import config
+
+SPELL_FILE = 'data/spells/spells_us.txt'
+SPELL_CACHE_FILE = 'data/spells/spells_us.cache'
+SPELL_CACHE_VERSION = 1
+
+# (column in spells_us.txt, type) of the values kept for each spell
+SPELL_COLUMNS = (
+    (0, int),  # id
+    (1, str),  # name
+    (6, str),  # effect_text_you
+    (7, str),  # effect_text_other
+    (8, str),  # effect_text_worn_off
+    (10, int),  # aoe_range
+    (13, int),  # cast_time
+    (85, int),  # resist_type
+    (16, int),  # duration_formula
+    (181, int),  # pvp_duration_formula
+    (17, int),  # duration
+    (182, int),  # pvp_duration
+    (83, int),  # type
+    (144, int),  # spell_icon
+)
+
+
+class Spell:
+    __slots__ = (
+        'id', 'name', 'effect_text_you', 'effect_text_other',
+        'effect_text_worn_off', 'aoe_range', 'max_targets', 'cast_time',
+        'resist_type', 'duration_formula', 'pvp_duration_formula', 'duration',
+        'pvp_duration', 'type', 'spell_icon'
+    )
+
+    def __init__(self, **kwargs):
+        self.id = 0
+        self.name = ''
+        self.effect_text_you = ''
+        self.effect_text_other = ''
+        self.effect_text_worn_off = ''
+        self.aoe_range = 0
+        self.max_targets = 1
+        self.cast_time = 0
+        self.resist_type = 0
+        self.duration_formula = 0
+        self.pvp_duration_formula = 0
+        self.duration = 0
+        self.pvp_duration = 0
+        self.type = 0
+        self.spell_icon = 0
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+
+class SpellBook:
+    """Table of every Spell, indexed by name as cast and by effect texts."""
+
+    def __init__(self, rows=()):
+        self.spells = []  # [Spell]
+        self._by_id = {}  # id: index into spells
+        self._by_name = {}  # name: index into spells
+        self._by_text_you = {}  # effect_text_you: index into spells
+        self._by_text_other = {}  # effect_text_other: index into spells
+        self._other_index = None  # OtherTextIndex, built on first use
+        strings = {}  # shares one copy of the many repeated effect texts
+        share = strings.setdefault
+        for values in rows:
+            self.add(Spell(
+                id=values[0],
+                name=values[1].lower(),
+                effect_text_you=share(values[2], values[2]),
+                effect_text_other=share(values[3], values[3]),
+                effect_text_worn_off=share(values[4], values[4]),
+                aoe_range=values[5],
+                max_targets=(6 if values[5] > 0 else 1),
+                cast_time=values[6],
+                resist_type=values[7],
+                duration_formula=values[8],
+                pvp_duration_formula=values[9],
+                duration=values[10],
+                pvp_duration=values[11],
+                type=values[12],
+                spell_icon=values[13]
+            ), values[1])
+
+    def __len__(self):
+        return len(self.spells)
+
+    def add(self, spell, cast_name):
+        self._other_index = None
+        index = len(self.spells)
+        self.spells.append(spell)
+        self._by_id[spell.id] = index
+        self._by_name[cast_name] = index
+        self._by_text_you[spell.effect_text_you] = index
+        self._by_text_other[spell.effect_text_other] = index
+
+    def get(self, cast_name, default=None):
+        """Returns the Spell named as in 'You begin casting <cast_name>.'"""
+        index = self._by_name.get(cast_name)
+        return default if index is None else self.spells[index]
+
+    def by_id(self, spell_id):
+        """Returns the Spell with id spell_id, else None."""
+        index = self._by_id.get(spell_id)
+        return None if index is None else self.spells[index]
+
+    def by_text_you(self, text):
+        """Returns the Spell whose effect_text_you is text, else None."""
+        index = self._by_text_you.get(text)
+        return None if index is None else self.spells[index]
+
+    def by_text_other(self, text):
+        """Returns the Spell whose effect_text_other is text, else None."""
+        index = self._by_text_other.get(text)
+        return None if index is None else self.spells[index]
+
+    def match_other(self, text):
+        """
+        Returns ([Spell], target) for a line ending in the effect_text_other of
+        some spells, ie. "Soandso's skin turns to stone.", else None.
+        """
+        if self._other_index is None:
+            self._other_index = OtherTextIndex(self.spells)
+        match = self._other_index.match(text)
+        if match:
+            indexes, target = match
+            return [self.spells[index] for index in indexes], target
+        return None
+
+
+class OtherTextIndex:
+    """
+    Trie over the words of every effect_text_other read from the end of the
+    line, so a line is matched in one pass over its words rather than by
+    comparing it with the ending of every spell.
+
+    The first word of an effect text is only the end of the line's word, as
+    in "'s" of "Soandso's", or is empty when the text starts with a space.
+    Each node keeps those first words with the spells ending there.
+    """
+
+    def __init__(self, spells):
+        self._root = ({}, {})  # (word: node, first word: (len(text), [index]))
+        for index, spell in enumerate(spells):
+            if not spell.effect_text_other:
+                continue
+            words = spell.effect_text_other.split(' ')
+            node = self._root
+            for word in reversed(words[1:]):
+                node = node[0].setdefault(word, ({}, {}))
+            endings = node[1].setdefault(
+                words[0], (len(spell.effect_text_other), []))
+            endings[1].append(index)
+
+    def match(self, text):
+        """Returns ([index], target) of the longest matching text, else None."""
+        words = text.split(' ')
+        node = self._root
+        best = None
+        position = len(words) - 1
+        while position >= 0:
+            word = words[position]
+            for first_word, (length, indexes) in node[1].items():
+                if word.endswith(first_word):
+                    target = text[:len(text) - length].strip()
+                    if target and (not best or length > best[0]):
+                        best = (length, indexes, target)
+            node = node[0].get(word)
+            if not node:
+                break
+            position -= 1
+        if best:
+            return best[1], best[2]
+        return None
+
+
+def create_spell_book():
+    """ Returns a SpellBook of every spell in spells_us.txt """
+    return SpellBook(load_spell_rows())
+
+
+def load_spell_rows():
+    """
+    Returns a list of tuples holding the SPELL_COLUMNS of each spell, from the
+    compiled cache when it is up to date with spells_us.txt.
+    """
+    stat = os.stat(SPELL_FILE)
+    source = (stat.st_mtime_ns, stat.st_size, SPELL_CACHE_VERSION)
+    try:
+        with open(SPELL_CACHE_FILE, 'rb') as cache_file:
+            cache = pickle.load(cache_file)
+        if cache['source'] == source:
+            return cache['rows']
+    except Exception:
+        pass  # missing, outdated or unreadable cache, rebuild below
+
+    rows = []
+    with open(SPELL_FILE) as spell_file:
+        for line in spell_file:
+            values = line.strip().split('^')
+            rows.append(tuple(cast(values[column]) for column, cast in SPELL_COLUMNS))
+    try:
+        # written aside and swapped in, a crash mid write cannot leave a
+        # corrupt cache behind
+        with open(SPELL_CACHE_FILE + '.tmp', 'wb') as cache_file:
+            pickle.dump({'source': source, 'rows': rows}, cache_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(SPELL_CACHE_FILE + '.tmp', SPELL_CACHE_FILE)
+    except OSError as e:
+        print("Failed to write spell cache: %s" % e)
+    return rows
+
+
+# ticks of each duration formula from (level, duration), 0 for unknown formulas
+DURATION_FORMULAS = {
+    0: lambda level, duration: 0,
+    1: lambda level, duration: min(int(math.ceil(level / 2.0)), duration),
+    2: lambda level, duration: min(int(math.ceil(level / 5.0 * 3)), duration),
+    3: lambda level, duration: min(int(level * 30), duration),
+    4: lambda level, duration: duration or 50,
+    5: lambda level, duration: duration or 3,
+    6: lambda level, duration: min(int(math.ceil(level / 2.0)), duration),
+    7: lambda level, duration: min(level, duration),
+    8: lambda level, duration: min(level + 10, duration),
+    9: lambda level, duration: min(int((level * 2) + 10), duration),
+    10: lambda level, duration: min(int(level * 3 + 10), duration),
+    11: lambda level, duration: duration,
+    12: lambda level, duration: duration,
+    15: lambda level, duration: duration,
+    50: lambda level, duration: 72000,
+    3600: lambda level, duration: duration or 3600,
+}
+
+_durations = {}  # (spell id, level): ticks
+_secondary = None  # frozenset of config use_secondary
+
+
+def clear_spell_durations():
+    """Drops the computed durations, for when the secondary duration settings change."""
+    global _secondary
+    _durations.clear()
+    _secondary = None
+
+
+def get_spell_duration(spell, level):
+    """Returns the ticks spell lasts at level, computed once per spell id and level."""
+    key = (spell.id, level)
+    if spell.id and key in _durations:
+        return _durations[key]
+
+    global _secondary
+    if _secondary is None:
+        _secondary = frozenset(config.data['spells']['use_secondary'])
+    if spell.name in _secondary:
+        formula, duration = spell.pvp_duration_formula, spell.pvp_duration
+    elif config.data['spells']['use_secondary_all'] and spell.type == 0:
+        formula, duration = spell.pvp_duration_formula, spell.pvp_duration
+    else:
+        formula, duration = spell.duration_formula, spell.duration
+
+    ticks = DURATION_FORMULAS.get(formula, DURATION_FORMULAS[0])(level, duration)
+    if spell.id:  # custom timers are all id 0
+        _durations[key] = ticks
+    return ticks
@@ -0,0 +1,323 @@
+"""
+Spell timers drawn by a single painted widget, a lighter alternative to the
+SpellContainer widget tree for when there are hundreds of timers.
+"""
+import bisect
+import datetime
+import itertools
+import string
+
+from PySide6.QtCore import QRect, Qt
+from PySide6.QtGui import QColor, QFont, QLinearGradient, QPainter, QPalette, QPen
+from PySide6.QtWidgets import QWidget
+
+from nParse.helpers import clock, config, format_time, scheduler
+from nParse.parsers.spells.icons import get_spell_pixmap
+from nParse.parsers.spells.limits import stale_targets
+from nParse.parsers.spells.spellbook import get_spell_duration
+
+HEADER_HEIGHT = 20
+ROW_HEIGHT = 17
+ICON_SIZE = 15
+
+TARGET_COLORS = {0: '#287AA9', 1: '#004400', 2: '#440000'}  # TargetType: header
+BAR_COLORS = {True: ('#FFF', '#21B6A8', '#287AA9'), False: ('#FFF', '#FF9900', '#DD7700')}
+
+
+class SpellTimer:
+    """A spell on a TimerTarget, with the methods Spells uses on a SpellWidget."""
+
+    __slots__ = ('spell', 'end_time', 'seconds', 'sort_key', '_active', '_remaining')
+
+    def __init__(self, spell, timestamp):
+        self.spell = spell
+        self.sort_key = None  # position in the TimerTarget
+        self._active = True
+        self._remaining = None  # frozen while paused
+        self.recast(timestamp)
+
+    def recast(self, timestamp):
+        ticks = get_spell_duration(self.spell, config.data['spells']['level'])
+        self.seconds = int(ticks * 6)
+        self.end_time = timestamp + datetime.timedelta(seconds=self.seconds)
+        if not self._active:
+            self._remaining = self.end_time - clock.now()
+
+    def remaining(self, now):
+        if not self._active:
+            return self._remaining
+        return self.end_time - now
+
+    @property
+    def paused(self):
+        return not self._active
+
+    def pause(self):
+        if self._active:
+            self._active = False
+            self._remaining = self.end_time - clock.now()
+
+    def resume(self):
+        """Ends after the time that was left when paused."""
+        if not self._active:
+            self._active = True
+            self.end_time = clock.now() + self._remaining
+
+    def elongate(self, seconds):
+        self.end_time += datetime.timedelta(seconds=seconds)
+
+
+class TimerTarget:
+    """The SpellTimers on one target, in the order they end."""
+
+    def __init__(self, target='__you__'):
+        self.name = target
+        if target == '__you__':
+            self.title = 'you'
+        elif target == '__custom__':
+            self.title = 'custom'
+        else:
+            self.title = target
+        self.target_type = 0
+        self.sort_key = None  # position in the SpellTimerList
+        self._timers = {}  # spell name: SpellTimer
+        self.timers = []  # [SpellTimer] in end time order
+        self._keys = []  # sorted (end_time, sequence) matching timers
+        self._sequence = itertools.count()
+        self._hostile = 0  # SpellTimers of detrimental spells
+
+    def __len__(self):
+        return len(self.timers)
+
+    def spell_widgets(self):
+        """Returns a list of all SpellTimers."""
+        return list(self.timers)
+
+    def add_spell(self, spell, timestamp):
+        target_type = spell.type and not self._hostile  # friendly if all spells are
+        timer = self._timers.get(spell.name)
+        if timer:
+            timer.recast(timestamp)
+            self._unlink(timer)
+        else:
+            timer = SpellTimer(spell, timestamp)
+            self._timers[spell.name] = timer
+            if not spell.type:
+                self._hostile += 1
+        if self.name in ('__you__', '__custom__'):
+            self.target_type = 0  # user
+        elif not target_type:  # treat target like enemy
+            self.target_type = 2  # enemy
+        else:
+            self.target_type = 1  # friendly
+
+        timer.sort_key = (timer.end_time, next(self._sequence))
+        position = bisect.bisect_left(self._keys, timer.sort_key)
+        self._keys.insert(position, timer.sort_key)
+        self.timers.insert(position, timer)
+        return timer
+
+    def remove(self, timer):
+        if self._timers.get(timer.spell.name) is timer:
+            del self._timers[timer.spell.name]
+            self._unlink(timer)
+            if not timer.spell.type:
+                self._hostile -= 1
+
+    def _unlink(self, timer):
+        position = bisect.bisect_left(self._keys, timer.sort_key)
+        del self._keys[position]
+        del self.timers[position]
+
+    def expire(self, now):
+        """Removes the timers that have run out, returns whether there were any."""
+        expired = [timer for timer in self.timers
+                   if timer._active and timer.end_time <= now]
+        for timer in expired:
+            self.remove(timer)
+        return bool(expired)
+
+    def elongate(self, seconds):
+        """Pushes back the end of every spell, ie. by the time spent zoning."""
+        for timer in self.timers:
+            timer.elongate(seconds)
+        self._sort()
+
+    def resume(self):
+        """Resumes every paused spell from the time it had left."""
+        for timer in self.timers:
+            timer.resume()
+        self._sort()
+
+    def _sort(self):
+        for timer in self.timers:
+            timer.sort_key = (timer.end_time, timer.sort_key[1])
+        self.timers.sort(key=lambda timer: timer.sort_key)
+        self._keys = [timer.sort_key for timer in self.timers]
+
+
+class SpellTimerList(QWidget):
+    """
+    Drop in replacement for SpellContainer that keeps each target and timer
+    as a plain record and paints them all in paintEvent.  Ticks once a second
+    from the shared scheduler while it holds any timers.
+    """
+
+    TARGET_KIB = 1.5  # estimated memory of a TimerTarget
+    SPELL_KIB = 0.6  # and of each SpellTimer on it
+
+    def __init__(self):
+        super().__init__()
+        self.setObjectName('SpellContainer')
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self._targets = {}  # name: TimerTarget, least recently updated first
+        self._order = []  # [TimerTarget] in display order
+        self._keys = []  # sorted (target_type, name) matching _order
+        self._name_font = QFont(self.font())
+        self._name_font.setPixelSize(12)
+        self._time_font = QFont(self._name_font)
+        self._time_font.setBold(True)
+        self._warning_font = QFont(self._time_font)
+        self._warning_font.setPixelSize(16)
+        self._header_font = QFont(self.font())
+        self._header_font.setPixelSize(14)
+        self._resize()
+
+    def add_spell(self, spell, timestamp, target='__you__'):
+        timer_target = self._targets.pop(target, None)
+        if timer_target is None:
+            timer_target = TimerTarget(target=target)
+        self._targets[target] = timer_target
+
+        timer = timer_target.add_spell(spell, timestamp)
+
+        key = (timer_target.target_type, target)
+        if key != timer_target.sort_key:
+            if timer_target.sort_key:
+                self._unlink(timer_target)
+            timer_target.sort_key = key
+            position = bisect.bisect_left(self._keys, key)
+            self._keys.insert(position, key)
+            self._order.insert(position, timer_target)
+
+        for stale_target in stale_targets(self._targets, target, self.TARGET_KIB, self.SPELL_KIB):
+            self._remove_target(stale_target)
+        self._resize()
+        self.update()
+        scheduler.add(self._tick)
+        return timer
+
+    def spell_targets(self):
+        """Returns a list of all TimerTargets."""
+        return list(self._order)
+
+    def get_spell_target_by_name(self, name):
+        return self._targets.get(name)
+
+    def _unlink(self, timer_target):
+        position = bisect.bisect_left(self._keys, timer_target.sort_key)
+        del self._keys[position]
+        del self._order[position]
+
+    def _remove_target(self, timer_target):
+        if self._targets.get(timer_target.name) is timer_target:
+            del self._targets[timer_target.name]
+            self._unlink(timer_target)
+
+    def _tick(self):
+        now = clock.now()
+        for timer_target in [t for t in self._order if t.expire(now) and not len(t)]:
+            self._remove_target(timer_target)
+        self._resize()
+        self.update()
+        return bool(self._order)
+
+    def _resize(self):
+        height = sum(HEADER_HEIGHT + ROW_HEIGHT * len(t) for t in self._order)
+        if height != self.minimumHeight():
+            self.setMinimumHeight(height)
+
+    def _item_at(self, y):
+        """Returns (TimerTarget, SpellTimer or None) of the row at y, else None."""
+        top = 0
+        for timer_target in self._order:
+            bottom = top + HEADER_HEIGHT + ROW_HEIGHT * len(timer_target)
+            if y < bottom:
+                if y < top + HEADER_HEIGHT:
+                    return timer_target, None
+                return timer_target, timer_target.timers[(y - top - HEADER_HEIGHT) // ROW_HEIGHT]
+            top = bottom
+        return None
+
+    def mouseDoubleClickEvent(self, event):
+        item = self._item_at(int(event.position().y()))
+        if item:
+            timer_target, timer = item
+            if timer:
+                timer_target.remove(timer)
+            if not timer or not len(timer_target):
+                self._remove_target(timer_target)
+            self._resize()
+            self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        exposed = event.rect()
+        painter.fillRect(exposed, QColor('black'))
+        text_color = self.palette().color(QPalette.ColorRole.WindowText)
+        width = self.width()
+        now = clock.now()
+        top = 0
+        for timer_target in self._order:
+            bottom = top + HEADER_HEIGHT + ROW_HEIGHT * len(timer_target)
+            if bottom < exposed.top():
+                top = bottom
+                continue
+            if top > exposed.bottom():
+                break
+
+            # target header
+            gradient = QLinearGradient(0, top, 0, top + HEADER_HEIGHT)
+            gradient.setColorAt(0.5, QColor('#000'))
+            gradient.setColorAt(0.8, QColor(TARGET_COLORS[timer_target.target_type]))
+            gradient.setColorAt(1.0, QColor('#000'))
+            painter.fillRect(0, top, width, HEADER_HEIGHT, gradient)
+            self._header_font.setBold(timer_target.target_type == 0)
+            painter.setFont(self._header_font)
+            painter.setPen(QColor('white'))
+            painter.drawText(QRect(0, top, width, HEADER_HEIGHT),
+                             Qt.AlignmentFlag.AlignCenter, timer_target.title.title())
+
+            # spell rows
+            y = top + HEADER_HEIGHT
+            for timer in timer_target.timers:
+                remaining = max(timer.remaining(now), datetime.timedelta())
+                warning = remaining.total_seconds() <= 30
+                painter.drawPixmap(0, y + 1, get_spell_pixmap(timer.spell.spell_icon))
+                bar = QRect(ICON_SIZE, y, width - ICON_SIZE, ROW_HEIGHT)
+                if timer.seconds:
+                    filled = int(bar.width() * min(remaining.seconds / timer.seconds, 1))
+                    colors = BAR_COLORS[bool(timer.spell.type)]
+                    gradient = QLinearGradient(0, y, 0, y + ROW_HEIGHT)
+                    gradient.setColorAt(0, QColor(colors[0]))
+                    gradient.setColorAt(0.5, QColor(colors[1]))
+                    gradient.setColorAt(1, QColor(colors[2]))
+                    painter.fillRect(bar.x(), y, filled, ROW_HEIGHT, gradient)
+                painter.setPen(QPen(QColor('red' if warning else 'black'), 1))
+                painter.setBrush(Qt.BrushStyle.NoBrush)
+                painter.drawRect(bar.adjusted(0, 0, -1, -1))
+                text = bar.adjusted(5, 0, -5, 0)
+                painter.setPen(text_color)
+                painter.setFont(self._name_font)
+                painter.drawText(text, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                                 string.capwords(timer.spell.name))
+                if warning:
+                    painter.setPen(QColor('red'))
+                    painter.setFont(self._warning_font)
+                else:
+                    painter.setFont(self._time_font)
+                painter.drawText(text, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                                 format_time(remaining))
+                y += ROW_HEIGHT
+            top = bottom
+        painter.end()
@@ -0,0 +1,701 @@
+import bisect
+import datetime
+import itertools
+import json
+import math
+import os
+import string
+
+from PySide6.QtCore import QEvent, Qt, QTimer
+from PySide6.QtWidgets import (QApplication, QFrame, QHBoxLayout, QLabel, QProgressBar,
+                             QScrollArea, QSpinBox, QVBoxLayout, QPushButton)
+
+from nParse.helpers.parser import ParserWindow
+from nParse.helpers import clock, config, format_time, scheduler, text_time_to_seconds
+from nParse.parsers.spells.customtimers import CustomTimerIndex
+from nParse.parsers.spells.icons import get_spell_icon
+from nParse.parsers.spells.limits import stale_targets
+from nParse.parsers.spells.timerlist import SpellTimerList
+from nParse.parsers.spells.spellbook import (Spell, clear_spell_durations, create_spell_book,
+                                              get_spell_duration)
+
+TIMERS_FILE = 'nparse.timers.json'
+TIMERS_INTERVAL = 30000  # msec
+
+
+class Spells(ParserWindow):
+    """Tracks spell casting, duration, and targets by name."""
+
+    def __init__(self):
+        self.name = "spells"
+        super().__init__()
+        QApplication.instance()._signals['settings'].spell_triggers_updated.connect(self.load_custom_timers)
+        QApplication.instance()._signals['settings'].config_updated.connect(clear_spell_durations)
+        self._setup_ui()
+        self.spell_book = create_spell_book()
+        self._custom_timers = CustomTimerIndex()
+        self.load_custom_timers()
+        self._casting = None  # holds SpellTrigger of the spell being cast
+        self._zoning = None  # holds time of zone or None
+        self._spell_triggers = SpellTriggerQueue(self._spell_triggered)  # landing windows overlap
+        self._timers_timer = None  # saves the active timers while running
+        self._saved_timers = None  # json last written to TIMERS_FILE
+
+    def _setup_ui(self):
+        self.setMinimumWidth(150)
+        if config.data['spells']['use_timer_list']:
+            self._spell_container = SpellTimerList()
+        else:
+            self._spell_container = SpellContainer()
+        self._scroll_area = QScrollArea()
+        self._scroll_area.setWidgetResizable(True)
+        self._scroll_area.setWidget(self._spell_container)
+        self._scroll_area.setObjectName('SpellScrollArea')
+        self.content.addWidget(self._scroll_area, 1)
+        self._custom_timer_toggle = QPushButton('\u26A1')
+        self._custom_timer_toggle.setCheckable(True)
+        self._custom_timer_toggle.setToolTip('Parse Custom Timers')
+        self._custom_timer_toggle.setChecked(config.data['spells']['use_custom_triggers'])
+        self._custom_timer_toggle.clicked.connect(self._toggle_custom_timers)
+        self.menu_area.addWidget(self._custom_timer_toggle)
+        self._level_widget = QSpinBox()
+        self._level_widget.setRange(1, 65)
+        self._level_widget.setValue(config.data['spells']['level'])
+        self._level_widget.setPrefix('lvl. ')
+        self.menu_area.addWidget(self._level_widget, 0)
+        self._level_widget.valueChanged.connect(self._level_change)
+
+    def _spell_triggered(self, spell_trigger):
+        """Adds the targets a closed SpellTrigger collected."""
+        if spell_trigger.activated:
+            for target in spell_trigger.targets:
+                self._spell_container.add_spell(
+                    spell_trigger.spell, target[0], target[1])
+        if spell_trigger is self._casting:
+            self._casting = None
+
+    def register(self, dispatcher):
+        dispatcher.add_default(self._parse_effects, self.parsing)
+        dispatcher.add_prefix('You begin casting', self._begin_casting, self.parsing)
+        for prefix in ('Your spell is interrupted.',
+                       'Your target resisted',
+                       'Your spell did not take hold.',
+                       'You try to cast a spell on'):
+            dispatcher.add_prefix(prefix, self._interrupted, self.parsing)
+        dispatcher.add_prefix('LOADING, PLEASE WAIT...', self._zoning_started, self.parsing)
+        dispatcher.add_prefix('You have entered', self._zoning_finished, self.parsing)
+
+    def _parse_effects(self, timestamp, text):
+        """Parse custom timers and the landing of spells being cast."""
+
+        # custom timers
+        if config.data['spells']['use_custom_triggers']:
+            for ct in self._custom_timers.match(text):
+                spell = Spell(
+                    name=ct.name,
+                    duration=int(text_time_to_seconds(ct.time)/6),
+                    duration_formula=11,  # honour duration ticks
+                    spell_icon=14
+                )
+                self._spell_container.add_spell(
+                    spell,
+                    timestamp,
+                    '__custom__'
+                )
+
+        # There are three main cases:
+        # 1) Items that have cast messages like "<item> begins to glow."
+        # 2) Items that have no cast message, cast on you (mostly insta-clickies)
+        # 3) Items that have no cast message, cast on others
+        # Case 1 may require either compiling a list of these items and detecting
+        # them as triggers, or else opening it up entirely like this does.
+        # Case 2 requires completely opening up detection, but will also detect
+        # any other buff cast on you, which may include things you wouldn't expect
+        # but can also NOT include many spells (when text is shared with an AoE
+        # version). It would also not properly detect level of spell when cast
+        # by other people.
+        # Case 3 is essentially impossible to deal with.
+        landed = self._spell_triggers.parse(timestamp, text)
+        if config.data['spells']['use_item_triggers'] and not landed:
+            spell = self.spell_book.by_text_you(text)
+            if spell:
+                self._spell_triggers.add(SpellTrigger(
+                    spell=spell,
+                    timestamp=timestamp
+                ))
+                landed = self._spell_triggers.parse(timestamp, text)
+
+        # Spells landing on others, whoever cast them.  The caster's level is
+        # unknown so durations use your own, and of the spells sharing the
+        # landing text the last one in spells_us.txt is used.
+        if config.data['spells']['use_other_triggers'] and not landed:
+            match = self.spell_book.match_other(text)
+            if match:
+                spells, target = match
+                spells = [spell for spell in spells if spell.duration_formula != 0]
+                if spells:
+                    self._spell_container.add_spell(spells[-1], timestamp, target)
+
+    def _begin_casting(self, timestamp, text):
+        """Initial Spell Cast and trigger setup."""
+        spell = self.spell_book.get(text[18:-1], None)
+        if spell and spell.duration_formula != 0:
+            # without a casting window a trigger is open until the next cast
+            self._spell_triggers.close_all(lambda spell_trigger: not spell_trigger.times_up_at)
+            self._casting = SpellTrigger(
+                spell=spell,
+                timestamp=timestamp
+            )
+            self._spell_triggers.add(self._casting)
+
+    def _interrupted(self, timestamp, text):
+        if self._casting:
+            self._spell_triggers.remove(self._casting)
+            self._casting = None
+
+    def _zoning_started(self, timestamp, text):
+        """Elongate self buff timers by time zoning."""
+        self._spell_triggers.close_all()
+        self._zoning = timestamp
+        spell_target = self._spell_container.get_spell_target_by_name(
+            '__you__')
+        if spell_target:
+            for spell_widget in spell_target.spell_widgets():
+                spell_widget.pause()
+
+    def _zoning_finished(self, timestamp, text):
+        if not self._zoning:
+            return
+        delay = (timestamp - self._zoning).total_seconds()
+        # If zoning took longer than like two minutes, likely false alarm
+        if delay > 120:
+            self._zoning = None
+        else:
+            spell_target = self._spell_container.get_spell_target_by_name(
+                '__you__')
+            if spell_target:
+                spell_target.elongate(delay)
+                spell_target.resume()
+
+    def _level_change(self, _):
+        config.data['spells']['level'] = self._level_widget.value()
+        config.save()
+
+    def load_custom_timers(self):
+        self._custom_timers = CustomTimerIndex(
+            CustomTrigger(*item) for item in config.data['spells']['custom_timers'])
+
+    def persist_timers(self):
+        """
+        Restores the timers active when nParse last quit, then saves them
+        every TIMERS_INTERVAL and on quit.
+        """
+        if config.data['spells']['restore_timers']:
+            self._restore_timers()
+        self._timers_timer = QTimer()
+        self._timers_timer.timeout.connect(self.save_timers)
+        self._timers_timer.start(TIMERS_INTERVAL)
+        QApplication.instance().aboutToQuit.connect(self.save_timers)
+
+    def save_timers(self):
+        if not config.data['spells']['restore_timers']:
+            return
+        timers = []
+        for spell_target in self._spell_container.spell_targets():
+            for spell_widget in spell_target.spell_widgets():
+                spell = spell_widget.spell
+                timer = {
+                    'target': spell_target.name,
+                    'id': spell.id,
+                    'end_time': spell_widget.end_time.isoformat(),
+                    'paused': spell_widget.paused,
+                }
+                if not spell.id:  # custom timer
+                    timer['name'] = spell.name
+                    timer['duration'] = spell.duration
+                timers.append(timer)
+        text = json.dumps({
+            'zoning': self._zoning.isoformat() if self._zoning else None,
+            'timers': timers,
+        })
+        if text == self._saved_timers:
+            return
+        try:
+            # swapped in whole, a crash mid write cannot truncate the timers
+            with open(TIMERS_FILE + '.tmp', mode='w') as f:
+                f.write(text)
+            os.replace(TIMERS_FILE + '.tmp', TIMERS_FILE)
+            self._saved_timers = text
+        except Exception as e:
+            print("Failed to save spell timers: %s" % e)
+
+    def _restore_timers(self):
+        try:
+            with open(TIMERS_FILE, 'r') as f:
+                snapshot = json.loads(f.read())
+        except:
+            # nparse.timers.json does not exist, nothing to restore
+            return
+        now = clock.now()
+        level = config.data['spells']['level']
+        for timer in snapshot.get('timers', []):
+            try:
+                end_time = datetime.datetime.fromisoformat(timer['end_time'])
+                if end_time <= now:
+                    continue
+                if timer['id']:
+                    spell = self.spell_book.by_id(timer['id'])
+                else:
+                    spell = Spell(
+                        name=timer['name'],
+                        duration=timer['duration'],
+                        duration_formula=11,  # honour duration ticks
+                        spell_icon=14
+                    )
+                if not spell:
+                    continue
+                seconds = int(get_spell_duration(spell, level) * 6)
+                spell_widget = self._spell_container.add_spell(
+                    spell,
+                    end_time - datetime.timedelta(seconds=seconds),
+                    timer['target']
+                )
+                if spell_widget and timer['paused']:
+                    spell_widget.pause()
+            except (KeyError, TypeError, ValueError):
+                continue  # not a timer this version wrote
+        if snapshot.get('zoning'):
+            # paused timers resume when the zone is entered
+            self._zoning = datetime.datetime.fromisoformat(snapshot['zoning'])
+
+    def _toggle_custom_timers(self, _):
+        config.data['spells']['use_custom_triggers'] = \
+            self._custom_timer_toggle.isChecked()
+        config.save()
+
+
+def _discard(keys, key):
+    """Removes key from the sorted list keys, if it is there."""
+    position = bisect.bisect_left(keys, key)
+    if position < len(keys) and keys[position] == key:
+        del keys[position]
+
+
+class SpellContainer(QFrame):
+
+    TARGET_KIB = 14  # estimated memory of a SpellTarget
+    SPELL_KIB = 33  # and of each SpellWidget on it
+
+    def __init__(self):
+        super().__init__()
+        self._layout = QVBoxLayout()
+        self.setLayout(self._layout)
+        self.setObjectName('SpellContainer')
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        self._layout.addStretch(1)
+        self._targets = {}  # name: SpellTarget, least recently updated first
+        self._keys = []  # sorted (TargetType, name) in layout order
+
+    def add_spell(self, spell, timestamp, target='__you__'):
+        spell_target = self._targets.pop(target, None)
+        if not spell_target:
+            spell_target = SpellTarget(target=target)
+        self._targets[target] = spell_target
+
+        spell_widget = spell_target.add_spell(spell, timestamp)
+        if not spell_widget:  # already worn off
+            if not spell_target.sort_key:
+                del self._targets[target]
+                spell_target.deleteLater()
+            return None
+
+        key = (int(spell_target.target_label.property('TargetType')), target)
+        if key != spell_target.sort_key:
+            if spell_target.sort_key:
+                _discard(self._keys, spell_target.sort_key)
+                self._layout.removeWidget(spell_target)
+            spell_target.sort_key = key
+            position = bisect.bisect_left(self._keys, key)
+            self._keys.insert(position, key)
+            self._layout.insertWidget(position, spell_target, 0)
+
+        for stale_target in stale_targets(self._targets, target, self.TARGET_KIB, self.SPELL_KIB):
+            stale_target._remove()
+        return spell_widget
+
+    def childEvent(self, event):
+        if event.type() == QEvent.Type.ChildRemoved:
+            spell_target = event.child()
+            if isinstance(spell_target, SpellTarget) and \
+                    self._targets.get(spell_target.name) is spell_target:
+                del self._targets[spell_target.name]
+                if spell_target.sort_key:
+                    _discard(self._keys, spell_target.sort_key)
+        event.accept()
+
+    def spell_targets(self):
+        """Returns a list of all SpellTargets."""
+        return list(self._targets.values())
+
+    def get_spell_target_by_name(self, name):
+        return self._targets.get(name)
+
+
+class SpellTarget(QFrame):
+
+    def __init__(self, target='__you__'):
+        super().__init__()
+        self.name = target
+        if target == '__you__':
+            self.title = 'you'
+        elif target == '__custom__':
+            self.title = 'custom'
+        else:
+            self.title = target
+        self.sort_key = None  # position in the SpellContainer
+        self._initialized = False  # don't delete until after first spell
+        self._spells = {}  # spell name: SpellWidget
+        self._keys = []  # sorted (end_time, sequence) in layout order
+        self._sequence = itertools.count()  # orders equal end times
+        self._hostile = 0  # SpellWidgets of detrimental spells
+        self.setObjectName('SpellContainer')
+
+        self._setup_ui()
+
+    def _setup_ui(self):
+        self._layout = QVBoxLayout()
+        self.setLayout(self._layout)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        self._layout.setSpacing(0)
+        self.target_label = QLabel(self.title.title())
+        self.target_label.setObjectName('SpellTargetLabel')
+        self.target_label.setMaximumHeight(20)
+        self.target_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.target_label.mouseDoubleClickEvent = self._remove
+        self._layout.addWidget(self.target_label, 0)
+        self._layout.addStretch()
+
+    def _remove(self, event=None):
+        self.setParent(None)
+        self.deleteLater()
+
+    def spell_widgets(self):
+        """Returns a list of all SpellWidgets."""
+        return list(self._spells.values())
+
+    def childEvent(self, event):
+        if event.type() == QEvent.Type.ChildRemoved:
+            spell_widget = event.child()
+            if isinstance(spell_widget, SpellWidget) and \
+                    self._spells.get(spell_widget.spell.name) is spell_widget:
+                del self._spells[spell_widget.spell.name]
+                _discard(self._keys, spell_widget.sort_key)
+                if not spell_widget.spell.type:
+                    self._hostile -= 1
+                if not self._spells:
+                    self._remove()
+        event.accept()
+
+    def add_spell(self, spell, timestamp):
+        target_type = spell.type and not self._hostile  # friendly if all spells are
+        spell_widget = self._spells.get(spell.name)
+        if spell_widget:
+            spell_widget.recast(timestamp)
+            _discard(self._keys, spell_widget.sort_key)
+            self._layout.removeWidget(spell_widget)
+        else:
+            spell_widget = SpellWidget(spell, timestamp)
+            if spell_widget.removed:
+                return None
+            self._spells[spell.name] = spell_widget
+            if not spell.type:
+                self._hostile += 1
+        if self.name in ('__you__', '__custom__'):
+            self.target_label.setProperty('TargetType', 0)  # user
+        elif not target_type:  # treat target like enemy
+            self.target_label.setProperty('TargetType', 2)  # enemy
+        else:
+            self.target_label.setProperty('TargetType', 1)  # friendly
+        self.target_label.setStyle(self.target_label.style())
+
+        spell_widget.sort_key = (spell_widget.end_time, next(self._sequence))
+        position = bisect.bisect_left(self._keys, spell_widget.sort_key)
+        self._keys.insert(position, spell_widget.sort_key)
+        self._layout.insertWidget(position + 1, spell_widget)  # + 1 - skip target label
+        return spell_widget
+
+    def elongate(self, seconds):
+        """Pushes back the end of every spell, ie. by the time spent zoning."""
+        for spell_widget in self._spells.values():
+            spell_widget.elongate(seconds)
+            spell_widget.sort_key = (spell_widget.end_time, spell_widget.sort_key[1])
+        self._keys = sorted(spell_widget.sort_key for spell_widget in self._spells.values())
+
+    def resume(self):
+        for spell_widget in self._spells.values():
+            spell_widget.resume()
+
+
+class SpellWidget(QFrame):
+
+    def __init__(self, spell, timestamp):
+        super().__init__()
+        self.setObjectName('SpellWidget')
+        self.spell = spell
+        self.sort_key = None  # position in the SpellTarget
+        self.removed = False  # worn off or dismissed
+        self._active = True
+        self._warning = False
+        self._time_text = None  # last shown in _time_label
+
+        self._setup_ui()
+        self._calculate(timestamp)
+        self.setProperty('Warning', False)
+        self._time_label.setProperty('Warning', False)
+        if self._update():
+            scheduler.add(self._update)
+
+    def _calculate(self, timestamp):
+        self._ticks = get_spell_duration(
+            self.spell, config.data['spells']['level'])
+        self._seconds = (int(self._ticks * 6))
+        self.end_time = timestamp + datetime.timedelta(seconds=self._seconds)
+        self.progress.setMaximum(self._seconds)
+
+    def _setup_ui(self):
+        # self
+        self.setMaximumHeight(17)
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+        layout.addWidget(get_spell_icon(self.spell.spell_icon), 0)
+        layout.setSpacing(0)
+
+        # progress bar
+        self.progress = QProgressBar()
+        self.progress.setTextVisible(False)
+        if self.spell.type:
+            self.progress.setObjectName('SpellWidgetProgressBarGood')
+        else:
+            self.progress.setObjectName('SpellWidgetProgressBarBad')
+
+        # labels
+        progress_layout = QHBoxLayout(self.progress)
+        progress_layout.setContentsMargins(5, 0, 5, 0)
+        self._name_label = QLabel(
+            string.capwords(self.spell.name), self.progress)
+        self._name_label.setObjectName('SpellWidgetNameLabel')
+        progress_layout.addWidget(self._name_label)
+        progress_layout.insertStretch(1, 1)
+        self._time_label = QLabel('', self.progress)
+        self._time_label.setObjectName('SpellWidgetTimeLabel')
+        progress_layout.addWidget(self._time_label)
+        layout.addWidget(self.progress, 1)
+
+    def recast(self, timestamp):
+        # shown on the next tick, removing a spell that has already worn off
+        # here would pull it out of the SpellTarget while it is re-adding it
+        self._calculate(timestamp)
+        self._set_warning(False)
+        self._time_text = None
+
+    def _set_warning(self, warning):
+        self._warning = warning
+        self.setProperty('Warning', warning)
+        self.setStyle(self.style())
+        self._time_label.setProperty('Warning', warning)
+        self._time_label.setStyle(self._time_label.style())
+
+    def _update(self):
+        """Ticked by the scheduler, returns False once the spell has worn off."""
+        if self._active:
+            remaining = self.end_time - clock.now()
+            remaining_seconds = remaining.total_seconds()
+            if remaining_seconds <= 0:
+                self._remove()
+                return False
+            if remaining_seconds <= 30 and not self._warning:
+                self._set_warning(True)
+            time_text = format_time(remaining)
+            if time_text != self._time_text:
+                self._time_text = time_text
+                self.progress.setValue(remaining.seconds)
+                self._time_label.setText(time_text)
+        return True
+
+    @property
+    def paused(self):
+        return not self._active
+
+    def pause(self):
+        self._active = False
+
+    def resume(self):
+        self._active = True
+
+    def elongate(self, seconds):
+        self.end_time += datetime.timedelta(seconds=seconds)
+
+    def _remove(self):
+        self.removed = True
+        scheduler.remove(self._update)
+        self.setParent(None)
+        self.deleteLater()
+
+    def mouseDoubleClickEvent(self, _):
+        self._remove()
+
+
+class SpellTrigger:
+    """Collects the targets of a spell landing within its casting window."""
+
+    def __init__(self, **kwargs):
+        self.timestamp = None  # datetime
+        self.spell = None  # Spell
+        self.sort_key = None  # position in the SpellTriggerQueue
+        self.__dict__.update(kwargs)
+
+        self.targets = []  # [(timestamp, target)]
+        self.activated = False
+        self.activate_at = None  # datetime
+        self.times_up_at = None  # datetime, None without a casting window
+
+        # create casting trigger window
+        if config.data['spells']['use_casting_window']:
+            buffer = config.data['spells']['casting_window_buffer']
+            self.activate_at = self.timestamp + datetime.timedelta(
+                milliseconds=self.spell.cast_time - buffer)
+            self.times_up_at = self.timestamp + datetime.timedelta(
+                milliseconds=self.spell.cast_time + buffer)
+        else:
+            self.activated = True
+
+    @property
+    def complete(self):
+        """Single target spells are done once they land."""
+        return bool(self.targets) and self.spell.max_targets == 1
+
+    def parse(self, timestamp, text):
+        """Returns True when text is the spell landing on a target."""
+        if not self.activated:
+            if timestamp < self.activate_at:
+                return False
+            self.activated = True
+        if self.spell.effect_text_you and text[:len(self.spell.effect_text_you)] == self.spell.effect_text_you:
+            # cast self
+            self.targets.append((timestamp, '__you__'))
+            return True
+        elif text[len(text) - len(self.spell.effect_text_other):] == self.spell.effect_text_other and \
+                len(self.spell.effect_text_other) > 0:
+            # cast other
+            target = text[:len(text) -
+                          len(self.spell.effect_text_other)].strip()
+            self.targets.append((timestamp, target))
+            return True
+        return False
+
+
+class SpellTriggerQueue:
+    """
+    Open SpellTriggers ordered by the end of their casting window.  A line is
+    matched against them in one pass, earliest window first.  Those past their
+    window are closed together, by the timestamp of the line parsed after it
+    or, when no more lines arrive, a single QTimer set for the earliest window.
+    """
+
+    def __init__(self, triggered):
+        self._triggered = triggered  # called with each SpellTrigger closed
+        self._triggers = []  # [SpellTrigger] by end of casting window
+        self._keys = []  # sorted (times_up_at, sequence) matching _triggers
+        self._sequence = itertools.count()
+        self._latest = None  # timestamp of the last line, the queue's now
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._timed_out)
+
+    def __len__(self):
+        return len(self._triggers)
+
+    def add(self, spell_trigger):
+        spell_trigger.sort_key = (
+            spell_trigger.times_up_at or datetime.datetime.max, next(self._sequence))
+        position = bisect.bisect_left(self._keys, spell_trigger.sort_key)
+        self._keys.insert(position, spell_trigger.sort_key)
+        self._triggers.insert(position, spell_trigger)
+        if self._latest is None or self._latest < spell_trigger.timestamp:
+            self._latest = spell_trigger.timestamp
+        self._arm()
+
+    def remove(self, spell_trigger):
+        """Drops spell_trigger without adding its targets."""
+        position = bisect.bisect_left(self._keys, spell_trigger.sort_key)
+        if position < len(self._triggers) and self._triggers[position] is spell_trigger:
+            del self._keys[position]
+            del self._triggers[position]
+            self._arm()
+
+    def close_all(self, condition=None):
+        """Closes every open SpellTrigger, or those meeting condition(spell_trigger)."""
+        for spell_trigger in list(self._triggers):
+            if condition is None or condition(spell_trigger):
+                self.remove(spell_trigger)
+                self._triggered(spell_trigger)
+
+    def expire(self, timestamp):
+        """Closes the SpellTriggers whose casting window passed before timestamp."""
+        self._close(bisect.bisect_left(self._keys, (timestamp,)))
+
+    def _timed_out(self):
+        """Closes the earliest SpellTriggers, no line having arrived in their window."""
+        if self._keys:
+            self._latest = self._keys[0][0]
+            self._close(bisect.bisect_right(self._keys, (self._latest, math.inf)))
+
+    def _close(self, count):
+        if count:
+            expired = self._triggers[:count]
+            del self._triggers[:count]
+            del self._keys[:count]
+            for spell_trigger in expired:
+                self._triggered(spell_trigger)
+        self._arm()
+
+    def parse(self, timestamp, text):
+        """Returns True when text is the landing of an open SpellTrigger."""
+        if self._latest is None or self._latest < timestamp:
+            self._latest = timestamp
+        if not self._triggers:
+            return False
+        self.expire(timestamp)
+        for spell_trigger in self._triggers:
+            if spell_trigger.parse(timestamp, text):
+                if spell_trigger.complete:
+                    self.remove(spell_trigger)  # make sure you don't get two triggers
+                    self._triggered(spell_trigger)
+                return True
+        return False
+
+    def _arm(self):
+        times_up_at = self._keys[0][0] if self._keys else datetime.datetime.max
+        if times_up_at == datetime.datetime.max:
+            self._timer.stop()
+            return
+        msec = clock.to_real_msec((times_up_at - self._latest).total_seconds() * 1000)
+        if msec is None:
+            self._timer.stop()  # replaying as fast as possible, lines expire them
+        else:
+            self._timer.start(max(math.ceil(msec), 0))
+
+
+class CustomTrigger:
+
+    def __init__(self, name='', text='', time='', **_):
+        self.name, self.text, self.time = name, text, time
+
+    def to_list(self):
+        return [self.name, self.text, self.time]
+
+    def __str__(self):
+        return '{},{},{}'.format(
+            self.name, self.text, self.time
+        )
@@ -0,0 +1,75 @@
+import os
+import pathlib
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from nParse.helpers import config  # noqa: E402
+
+REPO = pathlib.Path(__file__).resolve().parent.parent
+SPELL_COUNT = 4000
+EFFECT_TEXTS = 50  # spells_us.txt repeats a few effect texts many times
+
+
+def spell_line(spell_id):
+    values = ['0'] * 183
+    values[0] = str(spell_id)
+    values[1] = 'Spell %d' % spell_id
+    values[6] = 'You feel %d.' % (spell_id % EFFECT_TEXTS)
+    values[7] = ' looks %d.' % (spell_id % EFFECT_TEXTS)
+    values[8] = 'Your feeling %d fades.' % (spell_id % EFFECT_TEXTS)
+    values[10] = str(spell_id % 2 * 30)  # aoe_range
+    values[13] = '3000'  # cast_time
+    values[16] = str(spell_id % 12)  # duration_formula
+    values[17] = '10'  # duration
+    values[144] = str(spell_id % 300)  # spell_icon
+    return '^'.join(values)
+
+
+@pytest.fixture
+def spell_file(tmp_path, monkeypatch):
+    """A spells_us.txt of SPELL_COUNT spells named 'Spell <id>'."""
+    from nParse.parsers.spells import spellbook
+    spell_file = tmp_path / 'spells_us.txt'
+    spell_file.write_text('\n'.join(spell_line(i) for i in range(SPELL_COUNT)) + '\n')
+    monkeypatch.setattr(spellbook, 'SPELL_FILE', str(spell_file))
+    monkeypatch.setattr(spellbook, 'SPELL_CACHE_FILE', str(tmp_path / 'spells_us.cache'))
+    return spell_file
+
+
+@pytest.fixture
+def map_files(tmp_path, monkeypatch):
+    """Runs in the repository to read its data/maps, caching zones in tmp_path."""
+    from nParse.parsers.maps import mapcache
+    monkeypatch.chdir(REPO)
+    monkeypatch.setattr(mapcache, 'MAP_CACHE_LOCATION', str(tmp_path / 'map_cache'))
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    """Default settings, kept in memory."""
+    monkeypatch.setattr(config, 'data', {})
+    monkeypatch.setattr(config, '_filename', '')
+    config.verify_settings()
+    return config.data
+
+
+@pytest.fixture
+def qapp():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def spells(qapp, settings, spell_file, tmp_path, monkeypatch):
+    """A Spells window on the synthetic spells_us.txt."""
+    from nParse.helpers.settings import SettingsSignals
+    from nParse.parsers.spells import Spells, icons
+    monkeypatch.setattr(icons, 'ICON_CACHE_FILE', str(tmp_path / 'spell_icons.cache.png'))
+    monkeypatch.setattr(qapp, '_signals', {'settings': SettingsSignals()}, raising=False)
+    spells = Spells()
+    yield spells
+    spells.deleteLater()
+    qapp.processEvents()
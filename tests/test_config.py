@@ -0,0 +1,18 @@
+import json
+
+from nParse.helpers import config
+
+
+def test_keep_in_memory_stops_saving(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'data', {})
+    monkeypatch.setattr(config, '_filename', '')
+    config_file = tmp_path / 'nparse.config.json'
+    config_file.write_text(json.dumps({'maps': {'last_zone': 'west freeport'}}))
+
+    config.load(str(config_file))
+    config.keep_in_memory()
+    config.data['maps']['last_zone'] = 'the feerrott'
+    config.save()
+
+    assert json.loads(config_file.read_text()) == {'maps': {'last_zone': 'west freeport'}}
+    assert config.data['maps']['last_zone'] == 'the feerrott'
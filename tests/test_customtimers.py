@@ -0,0 +1,117 @@
+import random
+import re
+import timeit
+
+import pytest
+
+from nParse.parsers.spells import CustomTrigger
+from nParse.parsers.spells.customtimers import CustomTimerIndex
+
+TIMERS = [
+    ['Journeyman Boots', 'Your feet feel quick.', '00:18:00'],
+    ['Boots again', 'Your feet feel quick.', '00:18:00'],  # same text, replaces the first
+    ['Any feet', '* feet feel quick.', '00:01:00'],
+    ['Hail', 'Hail', '00:00:10'],
+    ['Hail anyone', 'Hail*', '00:00:20'],
+    ['Respawn', '*has been slain by*', '00:06:40'],
+    ['Tells', '* tells you, *', '00:00:30'],
+    ['Leading space', ' looks stronger.', '00:01:00'],
+    ['Regex word', 'Mr. Bones says *', '00:00:30'],
+    ['Quoted', "Soandso's skin turns to stone.", '00:04:00'],
+    ['Empty', '', '00:00:01'],
+]
+
+LINES = [
+    'Your feet feel quick.',
+    'YOUR feet feel quick.',
+    'His feet feel quick.',
+    'Hail',
+    'hail',
+    'Hailstorm',
+    'Hail, Soandso',
+    'a gnoll has been slain by Soandso!',
+    'Soandso tells you, \'hi\'',
+    ' looks stronger.',
+    'Mr. Bones says hello',
+    "Soandso's skin turns to stone.",
+    "soandso's skin turns to stone.",
+    '',
+    ' ',
+    'Your',
+    'your FEET feel quick.',
+]
+
+
+def linear_match(custom_triggers, text):
+    """Matching as before CustomTimerIndex: every regex, in configured order."""
+    timers = {}
+    for ct in custom_triggers:
+        rx = re.compile(
+            "^{}$".format(ct.text.replace('*', '.*')),
+            re.RegexFlag.IGNORECASE
+            )
+        timers[rx] = ct
+    return [ct for rx, ct in timers.items() if rx.match(text)]
+
+
+@pytest.mark.parametrize('line', LINES)
+def test_index_matches_linear_scan(line):
+    custom_triggers = [CustomTrigger(*item) for item in TIMERS]
+    index = CustomTimerIndex(custom_triggers)
+    assert index.match(line) == linear_match(custom_triggers, line)
+
+
+def test_index_keeps_configured_order():
+    custom_triggers = [CustomTrigger(*item) for item in TIMERS]
+    index = CustomTimerIndex(custom_triggers)
+    assert [ct.name for ct in index.match('Your feet feel quick.')] == ['Boots again', 'Any feet']
+    assert [ct.name for ct in index.match('Hail')] == ['Hail', 'Hail anyone']
+
+
+def random_timers(count, rng):
+    words = ['You', 'Your', 'Soandso', 'The', 'A', 'feel', 'skin', 'begins', 'glow', 'is']
+    timers = []
+    for i in range(count):
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        if rng.random() < 0.1:
+            text = '*' + text
+        elif rng.random() < 0.2:
+            text = text + ' *'
+        timers.append(CustomTrigger('timer %d' % i, text, '00:01:00'))
+    return timers
+
+
+def test_index_matches_linear_scan_random():
+    rng = random.Random(0)
+    custom_triggers = random_timers(300, rng)
+    index = CustomTimerIndex(custom_triggers)
+    for ct in custom_triggers:
+        line = ct.text.replace('*', rng.choice(['', 'Soandso', 'x y']))
+        for text in (line, line.upper(), line + ' more'):
+            assert index.match(text) == linear_match(custom_triggers, text)
+
+
+def test_index_benchmark():
+    rng = random.Random(0)
+    lines = ['Your feet feel quick.', 'Soandso begins to cast a spell.',
+             'You have been slain by a gnoll!', 'a gnoll hits YOU for 10 points of damage.']
+    print()
+    for count in (10, 100, 500):
+        custom_triggers = random_timers(count, rng)
+        index = CustomTimerIndex(custom_triggers)
+        # compiled up front, to time only the matching
+        regexes = {re.compile("^{}$".format(ct.text.replace('*', '.*')), re.IGNORECASE): ct
+                   for ct in custom_triggers}
+
+        def scan():
+            for line in lines:
+                [ct for rx, ct in regexes.items() if rx.match(line)]
+
+        def bucketed():
+            for line in lines:
+                index.match(line)
+
+        scan_usec = min(timeit.repeat(scan, number=200, repeat=3)) / 200 * 1e6
+        bucketed_usec = min(timeit.repeat(bucketed, number=200, repeat=3)) / 200 * 1e6
+        print('%d custom timers, %d lines: linear scan %.1f us, bucketed %.1f us'
+              % (count, len(lines), scan_usec, bucketed_usec))
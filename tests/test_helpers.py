@@ -0,0 +1,31 @@
+from datetime import datetime
+
+import pytest
+
+from nParse.helpers import TimestampParser
+
+
+def test_timestamp_parser_across_days():
+    parser = TimestampParser()
+    lines = [
+        '[Mon Jan 01 23:59:59 2024] You say, \'Hail\'',
+        '[Mon Jan 01 23:59:59 2024] You say, \'Hail\'',
+        '[Tue Jan 02 00:00:00 2024] You say, \'Hail\'',
+        '[Mon Jan 01 23:59:58 2024] You say, \'Hail\'',
+    ]
+    assert [parser.parse(line) for line in lines] == [
+        datetime(2024, 1, 1, 23, 59, 59),
+        datetime(2024, 1, 1, 23, 59, 59),
+        datetime(2024, 1, 2, 0, 0, 0),
+        datetime(2024, 1, 1, 23, 59, 58),
+    ]
+
+
+@pytest.mark.parametrize('line', [
+    'You say, \'Hail\'',
+    '[Mon Foo 01 00:00:00 2024] You say, \'Hail\'',
+    '[Mon Jan 01 00-00-00 2024] You say, \'Hail\'',
+])
+def test_timestamp_parser_rejects_lines_without_timestamp(line):
+    with pytest.raises(ValueError):
+        TimestampParser().parse(line)
@@ -0,0 +1,20 @@
+import pathlib
+
+from nParse.parsers.spells import icons
+
+REPO = pathlib.Path(__file__).resolve().parent.parent
+
+
+def test_atlas_cached(qapp, tmp_path, monkeypatch):
+    monkeypatch.chdir(REPO)
+    monkeypatch.setattr(icons, 'ICON_CACHE_FILE', str(tmp_path / 'spell_icons.cache.png'))
+    monkeypatch.setattr(icons, '_atlas', None)
+    monkeypatch.setattr(icons, '_icons', {})
+    built = icons.load_atlas()
+    assert [path.name for path in tmp_path.iterdir()] == ['spell_icons.cache.png']
+
+    monkeypatch.setattr(icons, '_atlas', None)
+    cached = icons.load_atlas()
+    assert cached is not built and not cached.isNull()
+    assert cached.size() == built.size()
+    assert icons.get_spell_pixmap(1).size() == icons.get_spell_pixmap(500).size()
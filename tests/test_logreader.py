@@ -0,0 +1,115 @@
+import os
+
+import pytest
+
+from nParse.helpers import checkpoints, logreader
+from nParse.helpers.logreader import LogFile
+
+LINE = b'[Mon Jan 01 10:00:%02d 2024] You say, \'Hail %d\'\r\n'
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    return tmp_path / 'eqlog_Soandso_P1999Green.txt'
+
+
+def append(log_file, data):
+    with open(log_file, 'ab') as f:
+        f.write(data)
+
+
+def test_read_keeps_partial_line_for_next_read(log_file):
+    append(log_file, LINE % (0, 0) + b'[Mon Jan 01 10:00:01 2024] You say')
+    log = LogFile(str(log_file))
+
+    assert log.read() == ["[Mon Jan 01 10:00:00 2024] You say, 'Hail 0'"]
+    assert log.checkpoint == len(LINE % (0, 0))
+    assert log.read() is None
+
+    append(log_file, b', \'Hail 1\'\r\n')
+    assert log.read() == ["[Mon Jan 01 10:00:01 2024] You say, 'Hail 1'"]
+    assert log.checkpoint == log.offset == os.path.getsize(log_file)
+
+
+def test_read_starts_over_when_truncated(log_file):
+    append(log_file, LINE % (0, 0) + LINE % (1, 1))
+    log = LogFile(str(log_file))
+    assert len(log.read()) == 2
+
+    log_file.write_bytes(LINE % (2, 2))  # rotated, shorter than before
+    assert log.read() == ["[Mon Jan 01 10:00:02 2024] You say, 'Hail 2'"]
+
+
+def test_read_is_capped_at_read_size(log_file, monkeypatch):
+    monkeypatch.setattr(logreader, 'READ_SIZE', 100)
+    lines = b''.join(LINE % (i, i) for i in range(10))
+    append(log_file, lines)
+    log = LogFile(str(log_file))
+
+    read = []
+    while True:
+        chunk = log.read()
+        if chunk is None:
+            break
+        assert log.offset - log.checkpoint < 100
+        read.extend(chunk)
+    assert read == lines.decode().splitlines()
+
+
+def test_read_gives_up_on_line_longer_than_read_size(log_file, monkeypatch):
+    monkeypatch.setattr(logreader, 'READ_SIZE', 10)
+    append(log_file, b'x' * 25 + b'\n')
+    log = LogFile(str(log_file))
+    assert log.read() == ['x' * 10]
+    assert log.read() == ['x' * 10]
+    assert log.read() == ['x' * 5]
+    assert log.read() is None
+
+
+def test_read_splits_only_on_line_feeds(log_file):
+    append(log_file, b'a\x0cb\x1ec\r\n\r\nd\n')
+    assert LogFile(str(log_file)).read() == ['a\x0cb\x1ec', '', 'd']
+
+
+def test_read_replaces_undecodable_bytes(log_file):
+    # 0x81 is undefined in cp1252
+    append(log_file, b'a\x0cb\r\nbad \x81\r\nc\r\n')
+    assert LogFile(str(log_file)).read() == ['a\x0cb', 'bad �', 'c']
+
+
+@pytest.fixture
+def checkpoint(log_file, monkeypatch):
+    monkeypatch.setattr(checkpoints, 'data', {})
+    append(log_file, LINE % (0, 0) + LINE % (1, 1))
+    offset = os.path.getsize(log_file)
+    checkpoints.update(str(log_file), offset, '[Mon Jan 01 10:00:01 2024]')
+    return offset
+
+
+def test_resume_offset(log_file, checkpoint):
+    append(log_file, LINE % (2, 2))
+    assert checkpoints.resume_offset(str(log_file)) == checkpoint
+
+
+def test_resume_offset_without_checkpoint(tmp_path, checkpoint):
+    other = tmp_path / 'eqlog_Other_P1999Green.txt'
+    other.write_bytes(LINE % (0, 0))
+    assert checkpoints.resume_offset(str(other)) is None
+
+
+def test_resume_offset_of_truncated_log(log_file, checkpoint):
+    log_file.write_bytes(LINE % (0, 0))
+    assert checkpoints.resume_offset(str(log_file)) is None
+
+
+def test_resume_offset_of_rewritten_log(log_file, checkpoint):
+    with open(log_file, 'r+b') as f:  # same file and size, other lines
+        f.write((LINE % (5, 5)) * 2)
+    assert checkpoints.resume_offset(str(log_file)) is None
+
+
+def test_resume_offset_of_replaced_log(log_file, checkpoint, tmp_path):
+    replacement = tmp_path / 'replacement.txt'
+    replacement.write_bytes(log_file.read_bytes())
+    os.replace(replacement, log_file)
+    assert checkpoints.resume_offset(str(log_file)) is None
@@ -0,0 +1,105 @@
+import time
+
+import pytest
+from PySide6.QtGui import QPainterPath
+from PySide6.QtWidgets import QGraphicsPathItem
+
+from nParse.parsers.maps.mapdata import MapData, add_lines, load_zone_layout
+
+LARGEST_MAP_FILES = ('trakanon', 'firiona', 'overthere', 'dreadlands', 'lakeofillomen')
+
+
+def segments(path):
+    """Returns the sorted (x1, y1, x2, y2) of every line drawn by path."""
+    drawn = []
+    last = None
+    for i in range(path.elementCount()):
+        element = path.elementAt(i)
+        if element.isLineTo():
+            drawn.append((last.x, last.y, element.x, element.y))
+        last = element
+    return sorted(drawn)
+
+
+def per_line_paths(layout):
+    """Paths as built before add_lines: a path copied and set back per line."""
+    items = []
+    for buckets in layout.lines.values():
+        for coordinates in buckets.values():
+            item = QGraphicsPathItem()
+            for i in range(0, len(coordinates), 4):
+                path = item.path()
+                path.moveTo(coordinates[i], coordinates[i + 1])
+                path.lineTo(coordinates[i + 2], coordinates[i + 3])
+                item.setPath(path)
+            items.append(item)
+    return items
+
+
+def bucket_paths(layout, build):
+    items = []
+    for buckets in layout.lines.values():
+        for coordinates in buckets.values():
+            path = QPainterPath()
+            build(path, coordinates)
+            items.append(QGraphicsPathItem(path))
+    return items
+
+
+def move_to_each(path, coordinates):
+    """One path per bucket with a moveTo for every line."""
+    for i in range(0, len(coordinates), 4):
+        path.moveTo(coordinates[i], coordinates[i + 1])
+        path.lineTo(coordinates[i + 2], coordinates[i + 3])
+
+
+def elements(items):
+    return sum(item.path().elementCount() for item in items)
+
+
+@pytest.fixture
+def layouts(qapp, map_files):
+    zones = {map_file_name: zone for zone, map_file_name in MapData.get_zone_dict().items()}
+    return {map_file_name: load_zone_layout(zones[map_file_name])
+            for map_file_name in LARGEST_MAP_FILES}
+
+
+def test_add_lines_draws_every_line(layouts):
+    for layout in layouts.values():
+        for buckets in layout.lines.values():
+            for coordinates in buckets.values():
+                expected, path = QPainterPath(), QPainterPath()
+                move_to_each(expected, coordinates)
+                add_lines(path, coordinates)
+                assert segments(path) == segments(expected)
+                assert path.elementCount() <= expected.elementCount()
+
+
+def test_add_lines_continues_path():
+    path = QPainterPath()
+    add_lines(path, [0, 0, 10, 0])
+    add_lines(path, [10, 0, 10, 10, 20, 20, 30, 30])
+    assert [(e.type, e.x, e.y) for e in (path.elementAt(i) for i in range(path.elementCount()))] == [
+        (QPainterPath.ElementType.MoveToElement, 0, 0),
+        (QPainterPath.ElementType.LineToElement, 10, 0),
+        (QPainterPath.ElementType.LineToElement, 10, 10),
+        (QPainterPath.ElementType.MoveToElement, 20, 20),
+        (QPainterPath.ElementType.LineToElement, 30, 30),
+    ]
+
+
+def test_add_lines_benchmark(layouts):
+    print()
+    for map_file_name, layout in layouts.items():
+        lines = sum(len(c) // 4 for buckets in layout.lines.values() for c in buckets.values())
+        timings = []
+        for build in (per_line_paths,
+                      lambda layout: bucket_paths(layout, move_to_each),
+                      lambda layout: bucket_paths(layout, add_lines)):
+            started = time.perf_counter()
+            items = build(layout)
+            timings.append(((time.perf_counter() - started) * 1000, elements(items)))
+        (per_line, _), (per_bucket, before), (added, after) = timings
+        print('%-14s %5d lines  per line %5.1f ms  per bucket %5.1f ms  add_lines %5.1f ms'
+              '  (%d -> %d elements)'
+              % (map_file_name, lines, per_line, per_bucket, added, before, after))
@@ -0,0 +1,108 @@
+import pathlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from nParse.parsers.maps import mapcache
+from nParse.parsers.maps.mapdata import MAP_FILES_LOCATION, MapData, load_zone_layout
+
+REPO = pathlib.Path(__file__).resolve().parent.parent
+
+
+def read_zones():
+    """Returns {map file name: zone name} of the zones in map_keys.ini."""
+    zones = {}
+    with open(REPO / 'data' / 'maps' / 'map_keys.ini') as file:
+        for line in file:
+            zone, map_file_name = (value.strip() for value in line.split('='))
+            zones.setdefault(map_file_name, zone)
+    return zones
+
+
+def parse_zone(map_file_name):
+    """
+    Returns (z groups, lines, poi) of a zone as MapData computed them from
+    the text of its map files before they were packed into arrays.
+    """
+    lines, poi, all_z = [], [], []
+    for map_file in mapcache.get_map_files(MAP_FILES_LOCATION, map_file_name):
+        with open(map_file) as f:
+            for line in f.readlines():
+                line_type = line.lower()[0:1]
+                data = [value.strip() for value in line[1:].split(',')]
+                if line_type == 'l':
+                    x1, y1, z1, x2, y2, z2 = map(float, data[0:6])
+                    lines.append((x1, y1, x2, y2, min(z1, z2), tuple(map(int, data[6:9]))))
+                    all_z.append(min(z1, z2))
+                elif line_type == 'p':
+                    x, y, z = map(float, data[0:3])
+                    poi.append((x, y, z, tuple(map(int, data[3:6])), int(data[6]), str(data[7])))
+
+    z_groups = []
+    last_value = None
+    first_run = True
+    for z in sorted(Counter(all_z).items(), key=lambda x: x[0]):
+        if last_value is None:
+            last_value = z
+            continue
+        if (abs(last_value[0] - z[0]) < 20) or z[1] < 8:
+            last_value = (last_value[0], last_value[1] + z[1])
+        else:
+            if first_run:
+                first_run = False
+                if last_value[1] < 40 or abs(last_value[0] - z[0]) < 18:
+                    last_value = z
+                    continue
+            z_groups.append(last_value[0])
+            last_value = z
+    if last_value[1] > 50:
+        z_groups.append(last_value[0])
+
+    def closest(z):
+        closest = min(z_groups, key=lambda x: abs(x - z))
+        if z < closest:
+            lower_index = z_groups.index(closest) - 1
+            if lower_index > -1:
+                closest = z_groups[lower_index]
+        return closest
+
+    return (
+        z_groups,
+        Counter((closest(z), rgb, x1, y1, x2, y2) for x1, y1, x2, y2, z, rgb in lines),
+        Counter((closest(p[2]),) + p for p in poi),
+    )
+
+
+@pytest.mark.parametrize('map_file_name, zone', sorted(read_zones().items()))
+def test_zone_layout_matches_map_files(map_files, map_file_name, zone):
+    if not mapcache.get_map_files(MAP_FILES_LOCATION, map_file_name):
+        pytest.skip('no map files for %s' % map_file_name)  # case sensitive file system
+    z_groups, lines, poi = parse_zone(map_file_name)
+
+    for _ in range(2):  # parsed, then read back from the cache
+        layout = load_zone_layout(zone)
+        assert layout.geometry['z_groups'] == z_groups
+        assert Counter(
+            (z, rgb) + tuple(coordinates[i:i + 4])
+            for z, buckets in layout.lines.items()
+            for rgb, coordinates in buckets.items()
+            for i in range(0, len(coordinates), 4)) == lines
+        assert Counter(
+            (z,) + point for z, points in layout.poi.items() for point in points) == poi
+    assert MapData.get_zone_dict()[zone] == map_file_name
+
+
+def test_zone_map_cache_written_concurrently(map_files, tmp_path):
+    map_file_name = 'trakanon'
+    expected = mapcache.load_zone_map(MAP_FILES_LOCATION, map_file_name).lines
+    cache_file = tmp_path / 'map_cache' / 'trakanon.cache'
+    cache_file.write_bytes(b'\x80\x05truncated')
+
+    with ThreadPoolExecutor(4) as executor:
+        zone_maps = list(executor.map(
+            lambda _: mapcache.load_zone_map(MAP_FILES_LOCATION, map_file_name), range(8)))
+
+    assert all(zone_map.lines == expected for zone_map in zone_maps)
+    assert [path.name for path in cache_file.parent.iterdir()] == ['trakanon.cache']
+    assert mapcache.load_zone_map(MAP_FILES_LOCATION, map_file_name).lines == expected
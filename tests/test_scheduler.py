@@ -0,0 +1,72 @@
+import pytest
+
+from nParse.helpers import scheduler
+from nParse.helpers.scheduler import SLACK, TickScheduler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler, 'time', clock)
+    return clock
+
+
+class Countdown:
+    def __init__(self):
+        self.ticks = 0
+
+    def tick(self):
+        self.ticks += 1
+
+
+def deadlines(tick_scheduler):
+    return sorted(deadline for deadline, _ in tick_scheduler._heap)
+
+
+def test_first_callback_waits_one_interval(qapp, clock):
+    tick_scheduler = TickScheduler()
+    countdown = Countdown()
+    tick_scheduler.add(countdown.tick)
+    assert deadlines(tick_scheduler) == [1001.0]
+
+
+def test_added_callback_joins_next_tick(qapp, clock):
+    tick_scheduler = TickScheduler()
+    first, second = Countdown(), Countdown()
+    tick_scheduler.add(first.tick)
+    clock.now += 0.3
+    tick_scheduler.add(second.tick)
+    assert deadlines(tick_scheduler) == [1001.0, 1001.0]
+
+    clock.now = 1001.0
+    tick_scheduler._tick()
+    assert (first.ticks, second.ticks) == (1, 1)
+    assert deadlines(tick_scheduler) == [1002.0, 1002.0]
+
+
+def test_added_callback_skips_tick_about_to_run(qapp, clock):
+    tick_scheduler = TickScheduler()
+    first, second = Countdown(), Countdown()
+    tick_scheduler.add(first.tick)
+    clock.now = 1001.0 - SLACK / 2000
+    tick_scheduler.add(second.tick)
+    assert deadlines(tick_scheduler) == [1001.0, 1002.0]
+
+
+def test_removed_callback_stops_ticking(qapp, clock):
+    tick_scheduler = TickScheduler()
+    countdown = Countdown()
+    tick_scheduler.add(countdown.tick)
+    tick_scheduler.remove(countdown.tick)
+    clock.now = 1001.0
+    tick_scheduler._tick()
+    assert countdown.ticks == 0
+    assert len(tick_scheduler) == 0
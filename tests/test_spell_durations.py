@@ -0,0 +1,121 @@
+import math
+
+import pytest
+
+from nParse.parsers.spells.spellbook import (DURATION_FORMULAS, Spell, clear_spell_durations,
+                                              get_spell_duration)
+
+LEVELS = range(1, 66)
+DURATIONS = (0, 1, 5, 30, 100, 1000, 100000)
+
+
+def old_spell_duration(spell, level, settings):
+    """get_spell_duration as it was before the formula table."""
+    if spell.name in settings['spells']['use_secondary']:
+        formula, duration = spell.pvp_duration_formula, spell.pvp_duration
+    elif settings['spells']['use_secondary_all'] and spell.type == 0:
+        formula, duration = spell.pvp_duration_formula, spell.pvp_duration
+    else:
+        formula, duration = spell.duration_formula, spell.duration
+
+    spell_ticks = 0
+    if formula == 0:
+        spell_ticks = 0
+    if formula == 1:
+        spell_ticks = int(math.ceil(level / float(2.0)))
+        spell_ticks = min(spell_ticks, duration)
+    if formula == 2:
+        spell_ticks = int(math.ceil(level / float(5.0) * 3))
+        spell_ticks = min(spell_ticks, duration)
+    if formula == 3:
+        spell_ticks = int(level * 30)
+        spell_ticks = min(spell_ticks, duration)
+    if formula == 4:
+        if duration == 0:
+            spell_ticks = 50
+        else:
+            spell_ticks = duration
+    if formula == 5:
+        spell_ticks = duration
+        if spell_ticks == 0:
+            spell_ticks = 3
+    if formula == 6:
+        spell_ticks = int(math.ceil(level / float(2.0)))
+        spell_ticks = min(spell_ticks, duration)
+    if formula == 7:
+        spell_ticks = level
+        spell_ticks = min(spell_ticks, duration)
+    if formula == 8:
+        spell_ticks = level + 10
+        spell_ticks = min(spell_ticks, duration)
+    if formula == 9:
+        spell_ticks = int((level * 2) + 10)
+        spell_ticks = min(spell_ticks, duration)
+    if formula == 10:
+        spell_ticks = int(level * 3 + 10)
+        spell_ticks = min(spell_ticks, duration)
+    if formula == 11:
+        spell_ticks = duration
+    if formula == 12:
+        spell_ticks = duration
+    if formula == 15:
+        spell_ticks = duration
+    if formula == 50:
+        spell_ticks = 72000
+    if formula == 3600:
+        if duration == 0:
+            spell_ticks = 3600
+        else:
+            spell_ticks = duration
+    return spell_ticks
+
+
+@pytest.fixture
+def durations(settings):
+    clear_spell_durations()
+    yield settings
+    clear_spell_durations()
+
+
+@pytest.mark.parametrize('formula', sorted(DURATION_FORMULAS) + [13, 100, 3601])
+def test_duration_formulas_match_old_durations(durations, formula):
+    for spell_id, duration in enumerate(DURATIONS, start=1):
+        spell = Spell(id=spell_id, name='spell', duration_formula=formula, duration=duration)
+        for level in LEVELS:
+            expected = old_spell_duration(spell, level, durations)
+            assert get_spell_duration(spell, level) == expected
+            assert get_spell_duration(spell, level) == expected  # memoized
+
+
+@pytest.mark.parametrize('formula', sorted(DURATION_FORMULAS))
+def test_secondary_durations_match_old_durations(durations, formula):
+    durations['spells']['use_secondary'] = ['levitate']
+    levitate = Spell(id=1, name='levitate', type=1, duration_formula=11, duration=5,
+                     pvp_duration_formula=formula, pvp_duration=100)
+    detrimental = Spell(id=2, name='root', type=0, duration_formula=11, duration=5,
+                        pvp_duration_formula=formula, pvp_duration=100)
+    for use_secondary_all in (False, True):
+        durations['spells']['use_secondary_all'] = use_secondary_all
+        clear_spell_durations()
+        for spell in (levitate, detrimental):
+            for level in LEVELS:
+                assert get_spell_duration(spell, level) == \
+                    old_spell_duration(spell, level, durations)
+
+
+def test_custom_timers_are_not_memoized(durations):
+    # custom timers all have id 0 and differ only by duration
+    for duration in DURATIONS:
+        spell = Spell(name='custom', duration_formula=11, duration=duration)
+        assert get_spell_duration(spell, 60) == duration
+
+
+def test_config_updated_drops_memoized_durations(qapp, durations, spells):
+    spell = spells.spell_book.get('Spell 11')  # formula 11, 10 ticks
+    spell.pvp_duration_formula, spell.pvp_duration = 11, 20
+    assert get_spell_duration(spell, 60) == 10
+
+    durations['spells']['use_secondary'] = ['spell 11']
+    assert get_spell_duration(spell, 60) == 10  # until the settings are applied
+    qapp._signals['settings'].config_updated.emit()
+    assert get_spell_duration(spell, 60) == 20
@@ -0,0 +1,159 @@
+import gc
+import random
+import tracemalloc
+
+from nParse.parsers.spells import spellbook
+
+
+class DictSpell:
+    """A Spell as stored before SpellBook, with a __dict__ per spell."""
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def create_dict_spell_book():
+    """The spell book before SpellBook: a Spell per name and effect text."""
+    spell_book, text_lookup_self, text_lookup_other = {}, {}, {}
+    with open(spellbook.SPELL_FILE) as spell_file:
+        for line in spell_file:
+            values = line.strip().split('^')
+            spell = DictSpell(
+                id=int(values[0]),
+                name=values[1].lower(),
+                effect_text_you=values[6],
+                effect_text_other=values[7],
+                effect_text_worn_off=values[8],
+                aoe_range=int(values[10]),
+                max_targets=(6 if int(values[10]) > 0 else 1),
+                cast_time=int(values[13]),
+                resist_type=int(values[85]),
+                duration_formula=int(values[16]),
+                pvp_duration_formula=int(values[181]),
+                duration=int(values[17]),
+                pvp_duration=int(values[182]),
+                type=int(values[83]),
+                spell_icon=int(values[144])
+            )
+            spell_book[values[1]] = spell
+            text_lookup_self[spell.effect_text_you] = spell
+            text_lookup_other[spell.effect_text_other] = spell
+    return spell_book, text_lookup_self, text_lookup_other
+
+
+def retained_kib(create):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        book = create()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del book
+    return size // 1024
+
+
+def test_spell_book_lookups(spell_file):
+    book = spellbook.create_spell_book()
+
+    assert len(book) == 4000
+    spell = book.get('Spell 42')
+    assert spell.name == 'spell 42'
+    assert spell.max_targets == 1 and book.get('Spell 43').max_targets == 6
+    assert book.by_id(42) is spell
+    assert book.get('spell 42') is None  # named as cast
+    # the last spell with an effect text wins, as in the dict it replaced
+    last = book.get('Spell 3992')
+    assert book.by_text_you('You feel 42.') is last
+    assert book.by_text_other(' looks 42.') is last
+    assert book.by_id(4000) is None
+
+
+def test_spell_rows_cached(spell_file):
+    rows = spellbook.load_spell_rows()
+    text = spell_file.read_text()
+    spell_file.write_text('')  # the cache is keyed on mtime and size
+    assert spellbook.load_spell_rows() == []
+    spell_file.write_text(text)
+    assert spellbook.load_spell_rows() == rows
+
+
+def test_spell_book_memory(spell_file):
+    spellbook.load_spell_rows()  # build the cache the spell book is loaded from
+    dict_kib = retained_kib(create_dict_spell_book)
+    book_kib = retained_kib(spellbook.create_spell_book)
+    print('\nspell book of 4000 spells: dict spells %d KiB, SpellBook %d KiB'
+          % (dict_kib, book_kib))
+    assert book_kib < dict_kib
+
+
+def test_spell_cache_replaced_whole(spell_file, tmp_path):
+    cache_file = tmp_path / 'spells_us.cache'
+    cache_file.write_bytes(b'\x80\x05truncated')
+    rows = spellbook.load_spell_rows()
+    assert len(rows) == 4000
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['spells_us.cache', 'spells_us.txt']
+    assert spellbook.load_spell_rows() == rows
+
+
+def other_book(texts):
+    """A SpellBook of a spell per effect_text_other in texts, ids from 1."""
+    return spellbook.SpellBook(
+        (spell_id, 'Spell %d' % spell_id, '', text, '', 0, 0, 0, 0, 0, 0, 0, 1, 0)
+        for spell_id, text in enumerate(texts, start=1))
+
+
+def linear_match_other(book, text):
+    """match_other as a scan over the endings of every spell."""
+    best = None
+    for spell in book.spells:
+        other = spell.effect_text_other
+        if other and text.endswith(other) and text[:len(text) - len(other)].strip():
+            if not best or len(other) > len(best[0]):
+                best = (other, [spell])
+            elif other == best[0]:
+                best[1].append(spell)
+    if best:
+        return best[1], text[:len(text) - len(best[0])].strip()
+    return None
+
+
+def ids(match):
+    return match and ([spell.id for spell in match[0]], match[1])
+
+
+def test_match_other_longest_of_overlapping_endings():
+    book = other_book([' looks better.', "'s wounds looks better.", ' better.'])
+    assert ids(book.match_other('Soandso looks better.')) == ([1], 'Soandso')
+    assert ids(book.match_other("Soandso's wounds looks better.")) == ([2], 'Soandso')
+    assert ids(book.match_other('Soandso feels better.')) == ([3], 'Soandso feels')
+
+
+def test_match_other_spells_sharing_text():
+    book = other_book([' looks stronger.', ' is slowed.', ' looks stronger.'])
+    assert ids(book.match_other('Soandso looks stronger.')) == ([1, 3], 'Soandso')
+    assert book.by_text_other(' looks stronger.').id == 3
+
+
+def test_match_other_target_named_like_a_word():
+    book = other_book([' turns to stone.', ' stone.', "'s skin turns to stone."])
+    assert ids(book.match_other('Stone turns to stone.')) == ([1], 'Stone')
+    assert ids(book.match_other('turns turns to stone.')) == ([1], 'turns')
+    assert ids(book.match_other("Turns's skin turns to stone.")) == ([3], 'Turns')
+    assert ids(book.match_other(' turns to stone.')) == ([2], 'turns to')
+    assert book.match_other(' stone.') is None  # no target
+    assert book.match_other('Soandso is stoned.') is None
+
+
+def test_match_other_matches_linear_scan():
+    words = ['a', 'looks', 'stone.', "'s", 'skin', 'is', 'feet']
+    rng = random.Random(0)
+    texts = []
+    for _ in range(200):
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        texts.append(rng.choice(['', ' ', "'s "]) + text)
+    book = other_book(texts)
+    for _ in range(2000):
+        line = ' '.join(rng.choice(words + ['Soandso']) for _ in range(rng.randint(1, 6)))
+        assert ids(book.match_other(line)) == ids(linear_match_other(book, line))
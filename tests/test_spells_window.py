@@ -0,0 +1,141 @@
+import datetime
+import json
+
+import pytest
+
+from nParse.helpers import clock
+from nParse.parsers.spells import icons, spellbook, window
+from nParse.parsers.spells.spellbook import Spell
+
+
+@pytest.fixture
+def spell_target(qapp, settings, tmp_path, monkeypatch):
+    monkeypatch.setattr(icons, 'ICON_CACHE_FILE', str(tmp_path / 'spell_icons.cache.png'))
+    spellbook.clear_spell_durations()
+    spell_target = window.SpellTarget(target='soandso')
+    yield spell_target
+    spell_target.deleteLater()
+    qapp.processEvents()
+
+
+def buff(spell_id, name, ticks):
+    return Spell(id=spell_id, name=name, duration_formula=11, duration=ticks, type=1)
+
+
+def layout_names(spell_target):
+    layout = spell_target._layout
+    widgets = [layout.itemAt(i).widget() for i in range(1, layout.count())]
+    return [widget.spell.name for widget in widgets if widget]
+
+
+def test_add_spell_keeps_keys_in_layout_order(spell_target):
+    now = clock.now()
+    spell_target.add_spell(buff(1, 'stoneskin', 100), now)
+    spell_target.add_spell(buff(2, 'spirit of wolf', 60), now)
+    spell_target.add_spell(buff(3, 'root', 10), now)
+    spell_target.add_spell(buff(1, 'stoneskin', 100), now - datetime.timedelta(seconds=590))
+
+    assert layout_names(spell_target) == ['stoneskin', 'root', 'spirit of wolf']
+    assert spell_target._keys == [w.sort_key for w in (
+        spell_target._spells['stoneskin'],
+        spell_target._spells['root'],
+        spell_target._spells['spirit of wolf'])]
+
+
+def test_recast_of_worn_off_spell_leaves_other_spells(spell_target):
+    now = clock.now()
+    spell_target.add_spell(buff(1, 'spirit of wolf', 60), now)
+    spell_target.add_spell(buff(2, 'root', 10), now)
+    spell_target.add_spell(buff(3, 'stoneskin', 100), now)
+
+    # recast with a timestamp from before it would have worn off
+    spell_target.add_spell(buff(1, 'spirit of wolf', 60), now - datetime.timedelta(seconds=900))
+    spell_target._spells['root']._remove()
+    spell_target.add_spell(buff(3, 'stoneskin', 100), now)
+
+    assert sorted(spell_target._keys) == spell_target._keys
+    assert sorted(spell_target._keys) == sorted(
+        w.sort_key for w in spell_target._spells.values())
+    assert set(spell_target._spells) == {'spirit of wolf', 'stoneskin'}
+
+    # the worn off recast goes on the next tick
+    assert spell_target._spells['spirit of wolf']._update() is False
+    assert list(spell_target._spells) == ['stoneskin']
+    assert spell_target._keys == [spell_target._spells['stoneskin'].sort_key]
+    assert layout_names(spell_target) == ['stoneskin']
+
+
+
+@pytest.mark.parametrize('ticks, age', [(10, 3600), (0, 0)])
+def test_spell_worn_off_when_added_is_not_kept(spell_target, qapp, ticks, age):
+    now = clock.now()
+    assert spell_target.add_spell(buff(1, 'root', ticks), now - datetime.timedelta(seconds=age)) is None
+    assert spell_target._spells == {} and spell_target._keys == [] and spell_target._hostile == 0
+    qapp.processEvents()  # the worn off SpellWidget is deleted
+
+    spell_widget = spell_target.add_spell(buff(2, 'root', 10), now)  # durations are memoized by id
+    assert spell_widget._update() is True
+    assert list(spell_target._spells) == ['root']
+    assert layout_names(spell_target) == ['root']
+
+
+def test_spell_worn_off_when_added_leaves_no_target(qapp, settings, tmp_path, monkeypatch):
+    monkeypatch.setattr(icons, 'ICON_CACHE_FILE', str(tmp_path / 'spell_icons.cache.png'))
+    spellbook.clear_spell_durations()
+    spell_container = window.SpellContainer()
+    now = clock.now()
+    spell_container.add_spell(buff(1, 'root', 10), now, 'soandso')
+
+    assert spell_container.add_spell(buff(2, 'root', 10), now - datetime.timedelta(hours=1), 'other') is None
+    assert spell_container.add_spell(buff(1, 'root', 10), now - datetime.timedelta(hours=1), 'soandso') \
+        is spell_container.get_spell_target_by_name('soandso')._spells['root']
+    assert [spell_target.name for spell_target in spell_container.spell_targets()] == ['soandso']
+    assert spell_container._keys == [spell_container.get_spell_target_by_name('soandso').sort_key]
+    spell_container.deleteLater()
+    qapp.processEvents()
+
+
+def test_save_timers_replaces_file(spells, tmp_path, monkeypatch):
+    timers_file = tmp_path / 'nparse.timers.json'
+    timers_file.write_text('{"timers": [')  # left by a crash mid write
+    monkeypatch.setattr(window, 'TIMERS_FILE', str(timers_file))
+    spells._spell_container.add_spell(buff(1, 'stoneskin', 100), clock.now(), 'soandso')
+
+    spells.save_timers()
+
+    assert [path.name for path in tmp_path.iterdir() if 'timers' in path.name] == \
+        ['nparse.timers.json']
+    assert [(timer['target'], timer['id']) for timer in json.loads(
+        timers_file.read_text())['timers']] == [('soandso', 1)]
+
+
+def test_replayed_cast_lands_by_line_timestamps(spells):
+    cast_at = clock.now() - datetime.timedelta(seconds=30)
+    spells._begin_casting(cast_at, 'You begin casting Spell 10.')
+    spells._parse_effects(cast_at + datetime.timedelta(seconds=1), 'You feel 10.')  # too soon
+    assert spells._spell_container.get_spell_target_by_name('__you__') is None
+
+    spells._parse_effects(cast_at + datetime.timedelta(seconds=3), 'You feel 10.')
+    spell_target = spells._spell_container.get_spell_target_by_name('__you__')
+    assert [w.spell.name for w in spell_target.spell_widgets()] == ['spell 10']
+
+
+def test_replayed_cast_window_closes_by_line_timestamps(spells):
+    cast_at = clock.now() - datetime.timedelta(seconds=30)
+    spells._begin_casting(cast_at, 'You begin casting Spell 10.')
+    spells._parse_effects(cast_at + datetime.timedelta(seconds=10), 'You feel 10.')
+    assert len(spells._spell_triggers) == 0
+    assert spells._spell_container.get_spell_target_by_name('__you__') is None
+
+
+def test_cast_window_closes_without_lines(spells):
+    cast_at = clock.now() - datetime.timedelta(seconds=30)
+    spells._begin_casting(cast_at, 'You begin casting Spell 10.')
+    spell_triggers = spells._spell_triggers
+    # timed from the cast line, not from the wall clock it is 30s behind
+    assert spell_triggers._timer.remainingTime() > 3000
+
+    spell_triggers._timed_out()
+    assert len(spell_triggers) == 0
+    assert not spell_triggers._timer.isActive()
+    assert spells._spell_container.get_spell_target_by_name('__you__') is None
@@ -0,0 +1,78 @@
+import datetime
+
+import pytest
+
+from nParse.helpers import clock
+from nParse.parsers.spells import icons, spellbook
+from nParse.parsers.spells.spellbook import Spell
+from nParse.parsers.spells.timerlist import SpellTimerList
+
+START = datetime.datetime(2024, 1, 1, 10, 0, 0)
+
+
+@pytest.fixture
+def virtual_clock():
+    virtual_clock = clock.VirtualClock(START, speed=0)
+    clock.install(virtual_clock)
+    yield virtual_clock
+    clock.install(clock.Clock())
+
+
+@pytest.fixture
+def timer_list(qapp, settings, virtual_clock, tmp_path, monkeypatch):
+    monkeypatch.setattr(icons, 'ICON_CACHE_FILE', str(tmp_path / 'spell_icons.cache.png'))
+    spellbook.clear_spell_durations()
+    timer_list = SpellTimerList()
+    yield timer_list
+    timer_list.deleteLater()
+    qapp.processEvents()
+
+
+def buff(spell_id, name, ticks):
+    return Spell(id=spell_id, name=name, duration_formula=11, duration=ticks, type=1)
+
+
+def test_add_spell_repaints(timer_list):
+    updates = []
+    timer_list.update = lambda: updates.append(True)
+    timer_list.add_spell(buff(1, 'stoneskin', 10), START)
+    timer_list.add_spell(buff(1, 'stoneskin', 10), START)
+    assert len(updates) == 2
+
+
+def test_paused_timer_freezes(timer_list, virtual_clock):
+    timer = timer_list.add_spell(buff(1, 'stoneskin', 10), START)
+    virtual_clock.set(START + datetime.timedelta(seconds=20))
+    timer.pause()
+
+    virtual_clock.set(START + datetime.timedelta(seconds=50))
+    assert timer.remaining(clock.now()) == datetime.timedelta(seconds=40)
+    timer_list._tick()
+    assert timer_list.spell_targets()[0].timers == [timer]
+
+    timer.resume()
+    assert timer.end_time == START + datetime.timedelta(seconds=90)
+    assert timer.remaining(clock.now()) == datetime.timedelta(seconds=40)
+
+
+def test_recast_while_paused(timer_list, virtual_clock):
+    timer = timer_list.add_spell(buff(1, 'stoneskin', 10), START)
+    timer.pause()
+    virtual_clock.set(START + datetime.timedelta(seconds=30))
+    timer_list.add_spell(buff(1, 'stoneskin', 10), START + datetime.timedelta(seconds=30))
+    assert timer.remaining(clock.now()) == datetime.timedelta(seconds=60)
+
+
+def test_resume_keeps_timers_in_end_order(timer_list, virtual_clock):
+    long = timer_list.add_spell(buff(1, 'stoneskin', 200), START)
+    short = timer_list.add_spell(buff(2, 'root', 10), START)
+    timer_target = timer_list.get_spell_target_by_name('__you__')
+    short.pause()
+    virtual_clock.set(START + datetime.timedelta(seconds=1180))
+    timer_target.resume()  # root now outlasts stoneskin
+
+    assert timer_target.timers == [long, short]
+    assert timer_target._keys == [long.sort_key, short.sort_key]
+    virtual_clock.set(START + datetime.timedelta(seconds=1200))
+    timer_list._tick()
+    assert timer_target.timers == [short]